@@ -1,697 +1,216 @@
 """
     This scipt returns the optimum path for the point robot to navigate through the obstacle space
-    Here we take the initial and goal state for the robot from the text file states.txt
-    In states.txt the first line contains the intial state and the second line contains the goal state
+    Here we take the initial and goal state for the robot from the command line
     In this scipt we use Dijkstras Algorithm for finding the optimal path
+    The solver is in pathplanning.py, the hierarchical planner for large maps in hierarchical.py
+    and the visualization in visualization.py, which is only imported when the search is shown or rendered
 """
 
-import cv2
-import numpy as np
 from typing import List
-from heapq import heappop,heappush
-from turtle import color
+import argparse
+import json
 import sys
+import time
 
-from pkg_resources import yield_lines
-
-
-#q is the list which we use for implementing Priority queue for Dijkstra algorithm
-q=list()
-
-#contains all the node of the graph that have been completely explored
-#this list is used for visualization purposes
-graph=list()
-
-#Class for handling the states of point robot
-class Node:
-    
-    #Constructor for the state requires coordinates in the map
-    def __init__(self,coordinate):
-        self.coordinate=coordinate
-        self.parentIndex=None
-        self.Index=None
-        self.COC=-1
-    
-    #setter for updating the coc for the node    
-    def updateCOC(self,cost: float):
-        self.COC=cost
-    
-    #equality operator is overriden to amke sure that the only the coordinate information of the nodes is checked for equality
-    def __eq__(self,object):
-        return self.coordinate==object.coordinate
-    
-    #less operator is overriden as a requirement for heap 
-    def __lt__(self,object):
-        if(self.coordinate[0]<object.coordinate[0]):
-            return True
-        else:
-            return False
-        
-        
-    
-def checkObstacle(x: int, y: int) -> bool:
-    """
-    This function checks wether a given node lies in the obstacle space
-
-    Args:
-        x (int): x coordinate of the node
-        y (int): y coordinate of the node
-
-    Returns:
-        bool: retruns true if the node is in obstacle space
-    """
-    
-    
-    #Boundary equations for the hexagon.
-    #These equations compensate for the 5mm clearence space
-    a=y+0.58*x - 260.84
-    b=x-240
-    c=y-0.57*x + 60.84
-    d=y+0.57*x - 170.02
-    e=x-160
-    f=y-0.58*x - 29.98
-    
-    
-    
-    #Boundary equations for the circle.
-    #This equation compensate for the 5mm clearence space
-    k=(x-300)**2 + (y-185)**2 -2025
-    
-    #Boundary equations for the 1st obstacel
-    #These equations compensate for the 5mm clearence space
-    #line p divides the obstacle into two convex polygons
-    l=y+1.23*x-221.40
-    m=y-0.31*x-178.85
-    n=y-0.85*x-104.83
-    o=y+3.20*x - 452.77
-    p=y+0.15*x-191.89
-    
-    
-    #boundary eqautions for the border 
-    #these compensate for the 5mm clearence at the boundaries
-    x1=x-5
-    x2=x-395
-    y1=y-5
-    y2=y-245
-    
-    
-    #conditions for checking if the node lies in the obstacle space
-    if((a<=0 and b<=0 and c>=0 and d >=0 and e>=0 and f<=0) or k<=0 or (m<=0 and n>=0 and p>=0) or(l>=0 and o<=0 and p<=0) or (x1<=0 or x2>=0 or y1<=0 or y2>=0)):
-        return True
-    else:
-        return False
-       
-    
-def UP(node: Node):
-    """
-    This functions takes in a node and applies the action (0,1) to it.
-    The coordinates of the new node are [Xnode,Ynode+1]
-    This functions returns the refrence for the node if it is already in priority queue
-    If the node is not in priority queue it creates a new node and returns it.
-    This function does not return the node if it lies in obstacle space
-
-    Args:
-        node (Node): Node for which (0,1) action is to be applied
-
-    Returns:
-        bool,Node: returns True, node if it does not lie in the obstacle space
-                   returns False,None if the new coordinate lies in the obstacle space
-    """
-    x=node.coordinate[0]
-    y=node.coordinate[1]+1
-    if(checkObstacle(x,y)):
-        return False, None
-    
-    
-    else:
-        newNode = Node ([x,y])
-        for i,element in  enumerate(q):
-            oldcost,popnode=element 
-            if popnode==newNode:
-                return True,popnode
-            
-        return True, newNode
-   
-   
-def DOWN(node: Node):
-    """
-    This functions takes in a node and applies the action (0,-1) to it.
-    The coordinates of the new node are [Xnode,Ynode-1]
-    This functions returns the refrence for the node if it is already in priority queue
-    If the node is not in priority queue it creates a new node and returns it.
-    This function does not return the node if it lies in obstacle space
-
-    Args:
-        node (Node): Node for which (0,-1) action is to be applied
-
-    Returns:
-        bool,Node: returns True, node if it does not lie in the obstacle space
-                   returns False,None if the new coordinate lies in the obstacle space
-    """
-    x=node.coordinate[0]
-    y=node.coordinate[1]-1
-    if(checkObstacle(x,y)):
-        return False, None
-    
-    else:
-        newNode = Node ([x,y])
-        for i,element in  enumerate(q):
-            oldcost,popnode=element 
-            if popnode==newNode:
-                return True,popnode
-            
-        return True, newNode
-        
-        
-    
-def LEFT(node: Node):
-    """
-    This functions takes in a node and applies the action (-1,0) to it.
-    The coordinates of the new node are [Xnode-1,Ynode]
-    This functions returns the refrence for the node if it is already in priority queue
-    If the node is not in priority queue it creates a new node and returns it.
-    This function does not return the node if it lies in obstacle space
-
-    Args:
-        node (Node): Node for which (-1,0) action is to be applied
-
-    Returns:
-        bool,Node: returns True, node if it does not lie in the obstacle space
-                   returns False,None if the new coordinate lies in the obstacle space
-    """
-    x=node.coordinate[0]-1
-    y=node.coordinate[1]
-    if(checkObstacle(x,y)):
-        return False, node
-    
-    else:
-        newNode = Node ([x,y])
-        for i,element in  enumerate(q):
-            oldcost,popnode=element 
-            if popnode==newNode:
-                return True,popnode
-            
-        return True, newNode
-    
-    
-    
-def RIGHT(node: Node):
-    """
-    This functions takes in a node and applies the action (1,0) to it.
-    The coordinates of the new node are [Xnode-1,Ynode]
-    This functions returns the refrence for the node if it is already in priority queue
-    If the node is not in priority queue it creates a new node and returns it.
-    This function does not return the node if it lies in obstacle space
-
-    Args:
-        node (Node): Node for which (1,0) action is to be applied
-
-    Returns:
-        bool,Node: returns True, node if it does not lie in the obstacle space
-                   returns False,None if the new coordinate lies in the obstacle space
-    """
-    x=node.coordinate[0]+1
-    y=node.coordinate[1]
-    if(checkObstacle(x,y)):
-        return False, None
-    
-    else:
-        newNode = Node ([x,y])
-        for i,element in  enumerate(q):
-            oldcost,popnode=element 
-            if popnode==newNode:
-                return True,popnode
-            
-        return True, newNode
-    
-       
-    
-def UPRIGHT(node: Node):
-    """
-    This functions takes in a node and applies the action (1,1) to it.
-    The coordinates of the new node are [Xnode+1,Ynode+1]
-    This functions returns the refrence for the node if it is already in priority queue
-    If the node is not in priority queue it creates a new node and returns it.
-    This function does not return the node if it lies in obstacle space
-
-    Args:
-        node (Node): Node for which (1,1) action is to be applied
-
-    Returns:
-        bool,Node: returns True, node if it does not lie in the obstacle space
-                   returns False,None if the new coordinate lies in the obstacle space
-    """
-    x=node.coordinate[0]+1
-    y=node.coordinate[1]+1
-    if(checkObstacle(x,y)):
-        return False, None
-    
-    else:
-        newNode = Node ([x,y])
-        for i,element in  enumerate(q):
-            oldcost,popnode=element 
-            if popnode==newNode:
-                return True,popnode
-            
-        return True, newNode
-  
-    
-
-def DOWNRIGHT(node: Node):
-    """
-    This functions takes in a node and applies the action (1,-1) to it.
-    The coordinates of the new node are [Xnode+1,Ynode-1]
-    This functions returns the refrence for the node if it is already in priority queue
-    If the node is not in priority queue it creates a new node and returns it.
-    This function does not return the node if it lies in obstacle space
-
-    Args:
-        node (Node): Node for which (1,-1) action is to be applied
-
-    Returns:
-        bool,Node: returns True, node if it does not lie in the obstacle space
-                   returns False,None if the new coordinate lies in the obstacle space
-    """
-    x=node.coordinate[0]+1
-    y=node.coordinate[1]-1
-    if(checkObstacle(x,y)):
-        return False, None
-    
-    else:
-        newNode = Node ([x,y])
-        for i,element in  enumerate(q):
-            oldcost,popnode=element 
-            if popnode==newNode:
-                return True,popnode
-            
-        return True, newNode
-    
-    
-def DOWNLEFT(node: Node):
-    """
-    This functions takes in a node and applies the action (-1,-1) to it.
-    The coordinates of the new node are [Xnode-1,Ynode-1]
-    This functions returns the refrence for the node if it is already in priority queue
-    If the node is not in priority queue it creates a new node and returns it.
-    This function does not return the node if it lies in obstacle space
-
-    Args:
-        node (Node): Node for which (-1,-1) action is to be applied
-
-    Returns:
-        bool,Node: returns True, node if it does not lie in the obstacle space
-                   returns False,None if the new coordinate lies in the obstacle space
-    """
-    x=node.coordinate[0]-1
-    y=node.coordinate[1]-1
-    if(checkObstacle(x,y)):
-        return False, None
-    
-    else:
-        newNode = Node ([x,y])
-        for i,element in  enumerate(q):
-            oldcost,popnode=element 
-            if popnode==newNode:
-                return True,popnode
-            
-        return True, newNode
-    
-    
-def UPLEFT(node: Node):
-    """
-    This functions takes in a node and applies the action (-1,1) to it.
-    The coordinates of the new node are [Xnode-1,Ynode+1]
-    This functions returns the refrence for the node if it is already in priority queue
-    If the node is not in priority queue it creates a new node and returns it.
-    This function does not return the node if it lies in obstacle space
-
-    Args:
-        node (Node): Node for which (-1,1) action is to be applied
-
-    Returns:
-        bool,Node: returns True, node if it does not lie in the obstacle space
-                   returns False,None if the new coordinate lies in the obstacle space
-    """
-    x=node.coordinate[0]-1
-    y=node.coordinate[1]+1
-    if(checkObstacle(x,y)):
-        return False, None
-    
-    else:
-        newNode = Node ([x,y])
-        for i,element in  enumerate(q):
-            oldcost,popnode=element 
-            if popnode==newNode:
-                return True,popnode
-            
-        return True, newNode
-    
-def visualize(path: List[int]):
-    """
-    This functions is implemented after we have found out the optimal path.
-    This function is used to visualize how the Dijkstra's algorithm explores around and finds the
-    optimal path betwen goal and inital node
-
-    Args:
-        path (List[int]): This list contains the index of the node on the optimal path
-    """
-    
-    #creating an inflated array to visualize the obstacle space
-    a=np.full((251,401,3),255)
-    a=a.astype(np.uint8)
-    
-    #drawing the circle with colour set to blue
-    a=cv2.circle(a,(300,250-185),45,(255,0,0),-1)
-    
-    #Constructing the boundary clearence 
-    a[0:6,:,:]=[0,0,0]
-    a[245:,:,:]=[0,0,0]
-    a[:,0:6,:]=[0,0,0]
-    a[:,395:,:]=[0,0,0]
-    
-    #creating the hexagon with color set to green
-    pt1=np.array([[200,250-145],[240,250-122],
-              [240,250-78],[200,250-55],
-              [160,250-78],[160,250-122]])
+import numpy as np
 
-    a=cv2.fillPoly(a,pts=[pt1],color=(0,255,0))
+from hierarchical import HierarchicalPlanner
+from pathplanning import (DEFAULT_MAP,FIELD_ENGINES,PROFILERS,QUEUES,SEARCH_MODES,FieldCache,PackedGrid,Planner,
+                          SearchState,TiledOccupancy,TraceWriter,loadMap,profiled,readMapFile,runBatch,stateFromTrace)
 
-    #creating the obstacle 1 with color set to red
-    pt2=np.array([[27,250-188],[137,250-223],[86,250-178],[118,250-77]])
 
-    a=cv2.fillPoly(a,pts=[pt2],color=(0,0,255))
-   
-    #these two arrays are used to collect  records for the parent index and COC for each closed node in graph list 
-    mat1=np.full((250,400),-3)
-    mat2=np.full((250,400),-3)
-    
-    for node in graph:
-        mat1[250-round(node.coordinate[1]),round(node.coordinate[0])]=node.parentIndex
-        mat2[250-node.coordinate[1],node.coordinate[0]]=node.COC
-      
-    width= 401
-    height= 251
-    
-    #writer= cv2.VideoWriter('outputVideo.avi',cv2.VideoWriter_fourcc('M','J','P','G'), 600, (width,height))
-       
-    #These two for loops are used to extract and display the node in the order they were added to graph list  
-    for i in range(-1,len(graph)-1):
-        
-        b=np.array(np.where(mat1==i)).T
-        d=list()
-        for x,y in b:
-            d.append(mat2[x,y])
-        d=np.array(d)
-        inds=np.argsort(d)
-        b=b[inds]
-    
-        for x,y in b:
-        
-            a[x,y,:]=[255,0,255]
-        
-            cv2.imshow("frame",a)
-            #writer.write(a)
-            cv2.waitKey(3)
-    
-    #This conatins the coordinates for the node on the optimal path
-    coordList=list()        
-    for index in path:
-        coordList.append(graph[index].coordinate)
-    #Drawing the optimal path    
-    coordList=(np.array([0,250])-np.array(coordList))*np.array([-1,1])
-    a=cv2.polylines(a,[coordList],isClosed=False,color=[0,0,0],thickness=1)
-    cv2.imshow("frame",a)
-    # for i in range(10):
-    #     writer.write(a)
-    # writer.release()
-    cv2.waitKey(0)    
-    cv2.destroyAllWindows()
-        
-    
-    
-def BackTrack(finalNode):
-    
-    """
-    This function backtracks on the nodes from the goal state to inital state to form the path.
-    This path is then written into file nodePath.txt.
-    
-    """
-    #List containing the indexes for nodes in the path.
-    path=list()
-    
-    #Adding the final node the list.
-    path.append(finalNode.Index)
-    
-    #Iteratively adding the node along the path to the list.
-    parent=finalNode.parentIndex
-    while parent!=-1:
-        
-        #Bactracking along the path until the initial node is reached for which the parentIndex=-1.
-        path.append(parent)
-        parent=graph[parent].parentIndex
-    
-    #Arranging the path so that it is from start to goal.   
-    path=path[::-1]
-    
-    #this method visualizes the algorithm
-    visualize(path)
-    
-    
-    
-    
-def mainAlgo(x: int, y: int, xg: int, yg:int):
+def mainAlgo(x: int, y: int, xg: int, yg:int, fieldCache: str = None, mode: str = "dijkstra",
+             render: str = None, cellsPerFrame: int = None, maxFrames: int = None, trace: str = None,
+             viz: bool = True, mapFile: str = None, clusterSize: int = 16, radius: float = 0.0,
+             clearance: float = None, stats: str = None, profile: str = None, profileOutput: str = None,
+             queue: str = "heap", fieldEngine: str = "wavefront", resolution: float = 1.0, packed: bool = False,
+             tileSize: int = None):
     """
-    This is the Dijkstras Algorithm for finding the optimal path between intial and goal node
+    This function finds the optimal path between intial and goal node and visualizes the search
 
     Args:
         xinit (int): x coordinate of the intial point
         yinit (int): y coordinate of the initial point
         xgaol (int): x coordinate of the goal point
         ygoal (int): y coordinate of the goal pint
-    """
-    
-    #get the intial and final coordinate for the robot
-    xinit,yinit=x,y
-    xgoal,ygoal=xg,yg
-    
+        fieldCache (str): directory of the cost field cache, when given the query is answered from the
+                          cached field rooted at the goal
+        mode (str): search algorithm, one of SEARCH_MODES or hpa for the hierarchical planner, whose
+                    exploration is not shown as only the abstract graph is searched
+        render (str): video file or directory of frames the search is rendered to instead of being shown
+        cellsPerFrame (int): number of cells drawn for every frame, 1 when shown and 100 when rendered by default
+        maxFrames (int): largest number of frames rendered, the frames with the optimal path included
+        trace (str): path of the binary trace the expansions of the search are written to
+        viz (bool): when false nothing is shown and the result is printed as one JSON object
+                    with the cost, the number of nodes expanded and heap operations and the path as [x, y] pairs
+        mapFile (str): path of the map file, the default map if none is given
+        clusterSize (int): size of the clusters in cells for the hpa mode
+        radius (float): radius of the robot, 0 for the point robot
+        clearance (float): clearance kept around the obstacles, the one of the map if none is given
+        stats (str): text or json for writing the counters of the search and the time of every phase
+                     to stderr after the query (see Planner.queryStats), None for not writing them
+        profile (str): one of PROFILERS for profiling the query, None for not profiling it
+        profileOutput (str): file the profile is written to, stderr if none is given
+        queue (str): priority queue of the search, one of QUEUES, the bucket queue only for the dijkstra mode
+        fieldEngine (str): engine computing the cost fields of the field cache, one of FIELD_ENGINES
+        resolution (float): number of cells per unit of the map, the points are cells of the grid and the cost
+                            is in units of the map
+        packed (bool): keep the occupancy grid bit-packed, 8 cells per byte
+        tileSize (int): compute the occupancy grid in tiles of this size as the search reaches them
+                        (see TiledOccupancy) instead of compiling the whole map, None for compiling it
+    """
+    begin=time.perf_counter()
+    if tileSize is not None:
+        #the render layer of the whole map is only compiled if the search is shown
+        occupancy=TiledOccupancy(readMapFile(mapFile or DEFAULT_MAP),radius,clearance,resolution,tileSize)
+        layer=None
+    else:
+        occupancy,layer=loadMap(mapFile,radius=radius,clearance=clearance,resolution=resolution,packed=packed)
+    compileSeconds=time.perf_counter()-begin
+    if mode=="hpa":
+        #the hierarchical planner only searches inside the clusters, so no search state of the whole map is built
+        #it works in cells, its cost is turned into units of the map below
+        grid=occupancy.unpack() if isinstance(occupancy,(PackedGrid,TiledOccupancy)) else occupancy
+        planner=HierarchicalPlanner.cached(grid,clusterSize)
+    else:
+        planner=Planner(occupancy,resolution)
+        planner.countLookups=stats is not None
     
     #check if the intial or final coordinate lies in the obstacle space    
-    if checkObstacle(xinit,yinit):
+    if planner.isObstacle(x,y):
         
-        print("Intial point in obstacle space.\nRun again with new intial point")
+        if not viz:
+            print(json.dumps({"error":"Intial point in obstacle space","cost":None,"path":[]}))
+        else:
+            print("Intial point in obstacle space.\nRun again with new intial point")
     
-    elif(checkObstacle(xgoal,ygoal)):
-        
-        print("Goal point in obstacle space.\nRun again with new Goal point")
+    elif(planner.isObstacle(xg,yg)):
         
+        if not viz:
+            print(json.dumps({"error":"Goal point in obstacle space","cost":None,"path":[]}))
+        else:
+            print("Goal point in obstacle space.\nRun again with new Goal point")
         
-    
     else:
-        #Intitailzing the intial node
-        initNode = Node([xinit,yinit])
-        initNode.parentIndex=-1
-        initNode.updateCOC(0)
-        
-        #Initializing the goal node
-        goalNode = Node([xgoal,ygoal])
-    
-        #pushing the intial node onto the heap
-        heappush(q, (initNode.COC,initNode))
-        
-        #Iterating through the heap while it is not empty
-        while len(q)!=0:
-            
-            #removing the node from the heap and adding it to the graph as it is a closed node now
-            _,node=heappop(q)
-            index=len(graph)
-            node.Index=index
-            graph.append(node)
-            
-            #If the poped node is the goal node we have found the optimal path
-            #we call the backtravk on this poped node for getting the path and visualizing it
-            if(node==goalNode):
-                
-                goalNode=node
-                print("Cost of the optimal Path: ", goalNode.COC)
-                BackTrack(goalNode)
-                break
-            
+        with profiled(profile,profileOutput):
+            if mode=="hpa":
+                cost,path=planner.plan((x,y),(xg,yg))
+                cost=None if cost is None else cost/resolution
+            elif fieldCache is not None:
+                cost,path=FieldCache(fieldCache,engine=fieldEngine).plan(planner,(x,y),(xg,yg))
+            elif trace is not None:
+                with TraceWriter(trace,planner.width,planner.height) as writer:
+                    cost,path=planner.plan((x,y),(xg,yg),mode,writer,queue)
             else:
-                #If the poped node is not the goal node we explore all its children by 
-                #applying the action set on the node
-                
-                
-                #Applying the action (0,1) to the node.
-                #If the possible new state is in obsatcle space we skip to the next action.
-                #If the new state is already in the queue we check its COC and compare it with new COC obtained from the node.
-                #If it more than the new COC we updates the states COC and parent parameter.
-                #If the node is not queue we add it to the queue.
-                notInObstacle,childNode=UP(node)   
-                newcoc=node.COC+1
-                if (notInObstacle) and (childNode not in graph):
-                    if childNode.COC!=-1:
-                        if newcoc<childNode.COC:
-                            childNode.updateCOC(newcoc)
-                            childNode.parentIndex=index
-                            
-                    else:
-                        childNode.updateCOC(newcoc)
-                        childNode.parentIndex=index
-                        heappush(q,(newcoc,childNode))
-                    
-                    
-                
-                #Applying the action (1,1) to the node.
-                #If the possible new state is in obsatcle space we skip to the next action.
-                #If the new state is already in the queue we check its COC and compare it with new COC obtained from the node.
-                #If it more than the new COC we updates the states COC and parent parameter.
-                #If the node is not queue we add it to the queue.
-                notInObstacle,childNode=UPRIGHT(node)    
-                newcoc=node.COC+1.4
-                if (notInObstacle) and (childNode not in graph):
-                    if childNode.COC!=-1:
-                        if newcoc<childNode.COC:
-                            childNode.updateCOC(newcoc)
-                            childNode.parentIndex=index
-                            
-                    else:
-                        childNode.updateCOC(newcoc)
-                        childNode.parentIndex=index
-                        heappush(q,(newcoc,childNode))
-                        
-                    
-            
-            
-                #Applying the action (1,0) to the node.
-                #If the possible new state is in obsatcle space we skip to the next action.
-                #If the new state is already in the queue we check its COC and compare it with new COC obtained from the node.
-                #If it more than the new COC we updates the states COC and parent parameter.
-                #If the node is not queue we add it to the queue.
-                notInObstacle,childNode=RIGHT(node)
-                newcoc=node.COC+1       
-                if (notInObstacle) and (childNode not in graph):
-                    if childNode.COC!=-1:
-                        if newcoc<childNode.COC:
-                            childNode.updateCOC(newcoc)
-                            childNode.parentIndex=index
-                            
-                    else:
-                        childNode.updateCOC(newcoc)
-                        childNode.parentIndex=index
-                        heappush(q,(newcoc,childNode))
-            
-            
-            
-                #Applying the action (1,-1) to the node.
-                #If the possible new state is in obsatcle space we skip to the next action.
-                #If the new state is already in the queue we check its COC and compare it with new COC obtained from the node.
-                #If it more than the new COC we updates the states COC and parent parameter.
-                #If the node is not queue we add it to the queue.
-                notInObstacle,childNode=DOWNRIGHT(node)
-                newcoc=node.COC+1.4 
-                if (notInObstacle) and (childNode not in graph):
-                    if childNode.COC!=-1:
-                        if newcoc<childNode.COC:
-                            childNode.updateCOC(newcoc)
-                            childNode.parentIndex=index
-                            
-                    else:
-                        childNode.updateCOC(newcoc)
-                        childNode.parentIndex=index
-                        heappush(q,(newcoc,childNode))      
-            
-                        
-                        
-            
-        
-                #Applying the action (-1,0) to the node.
-                #If the possible new state is in obsatcle space we skip to the next action.
-                #If the new state is already in the queue we check its COC and compare it with new COC obtained from the node.
-                #If it more than the new COC we updates the states COC and parent parameter.
-                #If the node is not queue we add it to the queue.
-                notInObstacle,childNode=DOWN(node) 
-                newcoc=node.COC+1
-                if (notInObstacle) and (childNode not in graph):
-                    if childNode.COC!=-1:
-                        if newcoc<childNode.COC:
-                            childNode.updateCOC(newcoc)
-                            childNode.parentIndex=index
-                            
-                    else:
-                        childNode.updateCOC(newcoc)
-                        childNode.parentIndex=index
-                        heappush(q,(newcoc,childNode))       
-                
-        
-        
-        
-        
-                #Applying the action (-1,-1) to the node.
-                #If the possible new state is in obsatcle space we skip to the next action.
-                #If the new state is already in the queue we check its COC and compare it with new COC obtained from the node.
-                #If it more than the new COC we updates the states COC and parent parameter.
-                #If the node is not queue we add it to the queue.
-                notInObstacle,childNode=DOWNLEFT(node)   
-                newcoc=node.COC+1.4
-                if (notInObstacle) and (childNode not in graph):
-                    if childNode.COC!=-1:
-                        if newcoc<childNode.COC:
-                            childNode.updateCOC(newcoc)
-                            childNode.parentIndex=index
-                            
-                    else:
-                        childNode.updateCOC(newcoc)
-                        childNode.parentIndex=index
-                        heappush(q,(newcoc,childNode))      
-                
-                            
-                
-                
-                
-                #Applying the action (0,-1) to the node.
-                #If the possible new state is in obsatcle space we skip to the next action.
-                #If the new state is already in the queue we check its COC and compare it with new COC obtained from the node.
-                #If it more than the new COC we updates the states COC and parent parameter.
-                #If the node is not queue we add it to the queue.
-                notInObstacle,childNode=LEFT(node)     
-                newcoc=node.COC+1       
-                if (notInObstacle) and (childNode not in graph):
-                    if childNode.COC!=-1:
-                        if newcoc<childNode.COC:
-                            childNode.updateCOC(newcoc)
-                            childNode.parentIndex=index
-                            
-                    else:
-                        childNode.updateCOC(newcoc)
-                        childNode.parentIndex=index
-                        heappush(q,(newcoc,childNode))
-                            
-                    
-                    
-                    
-                #Applying the action (-1,1) to the node.
-                #If the possible new state is in obsatcle space we skip to the next action.
-                #If the new state is already in the queue we check its COC and compare it with new COC obtained from the node.
-                #If it more than the new COC we updates the states COC and parent parameter.
-                #If the node is not queue we add it to the queue.           
-                notInObstacle,childNode=UPLEFT(node)     
-                newcoc=node.COC+1.4
-                if (notInObstacle) and (childNode not in graph):
-                    if childNode.COC!=-1:
-                        if newcoc<childNode.COC:
-                            childNode.updateCOC(newcoc)
-                            childNode.parentIndex=index
-                            
-                    else:
-                        childNode.updateCOC(newcoc)
-                        childNode.parentIndex=index
-                        heappush(q,(newcoc,childNode))   
+                cost,path=planner.plan((x,y),(xg,yg),mode,queue=queue)
+        renderSeconds=None
+        if not viz:
+            heapOps=None if mode=="hpa" else planner.heapOps
+            print(json.dumps({"cost":cost,"expanded":planner.expanded,"heapOps":heapOps,"path":path}))
+        elif cost is None:
+            print("No path exists between the intial and goal point")
+        else:
+            print("Cost of the optimal Path: ", cost)
+            print("Nodes expanded: ", planner.expanded)
+            memory={"occupancy":occupancy.nbytes} if mode=="hpa" else planner.memoryUsage()
+            if tileSize is not None:
+                storage=" (%d tiles computed)"%occupancy.computed
+            else:
+                storage=" (bit-packed)" if packed else ""
+            print("Grid: %dx%d cells, %g per unit, occupancy %.1f KiB%s"%(
+                  planner.width,planner.height,resolution,memory["occupancy"]/1024,storage))
+            if mode!="hpa":
+                print("Heap operations: ",planner.heapOps)
+                print("Peak search memory: %.1f KiB"%(memory["search"]/1024))
+            
+            #this method visualizes the algorithm, only the path is shown for the hierarchical planner
+            reverseState=planner.reverseState if mode=="bidirectional" else None
+            state=SearchState(planner.width,planner.height) if mode=="hpa" else planner.state
+            if layer is None:
+                layer=loadMap(mapFile,radius=radius,clearance=clearance,resolution=resolution)[1]
+            begin=time.perf_counter()
+            showExploration(state,path,reverseState,render,cellsPerFrame,maxFrames,layer)
+            renderSeconds=time.perf_counter()-begin
+        
+        if stats is not None:
+            queryStats={"mode":"hpa","expanded":planner.expanded} if mode=="hpa" else planner.queryStats()
+            queryStats.update(compileSeconds=compileSeconds,renderSeconds=renderSeconds)
+            printStats(queryStats,stats)
+
+
+def printStats(queryStats: dict, form: str = "text"):
+    #writes the counters and timers of a query to stderr, as one JSON object or one line per value
+    if form=="json":
+        print(json.dumps(queryStats),file=sys.stderr)
+    else:
+        for name,value in queryStats.items():
+            print("%-17s %s"%(name+":",value),file=sys.stderr)
+
+
+def showExploration(state: SearchState, path: List[tuple], reverseState: SearchState = None, render: str = None,
+                    cellsPerFrame: int = None, maxFrames: int = None, layer: np.ndarray = None):
+    #shows the exploration of a search, or renders it when render is given (see mainAlgo)
+    from visualization import renderExploration,visualize
+    
+    if render is not None:
+        frames=renderExploration(state,path,render,cellsPerFrame or 100,maxFrames,reverseState=reverseState,layer=layer)
+        print("Frames rendered: ", frames)
+    else:
+        visualize(state,path,reverseState,cellsPerFrame or 1,layer)
                         
 
 #Program starts execution from here                        
 if __name__=="__main__":
-    xinit=int(sys.argv[1])
-    yinit=int(sys.argv[2])
-    xgoal=int(sys.argv[3])
-    ygoal=int(sys.argv[4])   
-    mainAlgo(xinit,yinit,xgoal,ygoal)         
\ No newline at end of file
+    parser=argparse.ArgumentParser(description="Optimal path for the point robot with Dijkstras Algorithm")
+    parser.add_argument("xinit",type=int,nargs="?",help="x coordinate of the intial point")
+    parser.add_argument("yinit",type=int,nargs="?",help="y coordinate of the intial point")
+    parser.add_argument("xgoal",type=int,nargs="?",help="x coordinate of the goal point")
+    parser.add_argument("ygoal",type=int,nargs="?",help="y coordinate of the goal point")
+    parser.add_argument("--map",metavar="FILE",help="JSON or YAML map file, maps/default.json by default")
+    parser.add_argument("--radius",type=float,default=0.0,help="radius of the robot, 0 for the point robot")
+    parser.add_argument("--clearance",type=float,help="clearance kept around the obstacles, the one of the map by default")
+    parser.add_argument("--resolution",type=float,default=1.0,help="number of cells per unit of the map, 1 by default")
+    parser.add_argument("--packed",action="store_true",help="keep the occupancy grid bit-packed, 8 cells per byte")
+    parser.add_argument("--tile-size",type=int,help="compute the occupancy grid in tiles of this size as the search reaches them")
+    parser.add_argument("--field-cache",metavar="DIR",help="answer the query from the cost field of the goal cached in DIR")
+    parser.add_argument("--field-engine",choices=FIELD_ENGINES,default="wavefront",help="engine computing the fields of --field-cache, wavefront by default")
+    parser.add_argument("--mode",choices=SEARCH_MODES+("hpa",),default="dijkstra",help="search algorithm, dijkstra by default")
+    parser.add_argument("--queue",choices=QUEUES,default="heap",help="priority queue of the dijkstra search, heap by default")
+    parser.add_argument("--cluster-size",type=int,default=16,help="size of the clusters in cells for --mode hpa, 16 by default")
+    parser.add_argument("--batch",metavar="FILE",help="plan every query of a CSV or JSONL file and write the results to stdout")
+    parser.add_argument("--workers",type=int,help="number of worker processes for --batch, the number of cores by default")
+    parser.add_argument("--no-viz",action="store_true",help="do not show the search, print the cost and path as JSON")
+    parser.add_argument("--trace",metavar="FILE",help="write the expansions of the search to a binary trace FILE")
+    parser.add_argument("--replay",metavar="FILE",help="show or render the search recorded in a trace FILE instead of planning")
+    parser.add_argument("--render",metavar="PATH",help="render the search to an .avi/.mp4 video or a directory of PNG frames instead of showing it")
+    parser.add_argument("--cells-per-frame",type=int,help="number of explored cells drawn for every frame")
+    parser.add_argument("--stats",choices=("text","json"),help="write the counters of the search and the time of every phase to stderr")
+    parser.add_argument("--profile",choices=PROFILERS,help="profile the query with cProfile or tracemalloc")
+    parser.add_argument("--profile-output",metavar="FILE",help="write the profile to FILE instead of stderr")
+    parser.add_argument("--max-frames",type=int,help="largest number of frames rendered, the frames with the path included")
+    args=parser.parse_args()
+    if args.queue=="bucket" and args.mode!="dijkstra":
+        parser.error("--queue bucket can only be used with --mode dijkstra")
+    elif args.mode=="hpa" and (args.batch is not None or args.field_cache is not None or args.trace is not None):
+        parser.error("--mode hpa can not be used with --batch, --field-cache or --trace")
+    elif args.resolution<=0:
+        parser.error("--resolution has to be positive")
+    elif args.tile_size is not None and (args.tile_size<=0 or args.packed or args.batch is not None):
+        parser.error("--tile-size has to be positive and can not be used with --packed or --batch")
+    elif args.batch is not None:
+        occupancy=loadMap(args.map,radius=args.radius,clearance=args.clearance,resolution=args.resolution,
+                          packed=args.packed)[0]
+        runBatch(args.batch,workers=args.workers,occupancy=occupancy,mode=args.mode,queue=args.queue,resolution=args.resolution)
+    elif args.replay is not None:
+        forward,reverse,path=stateFromTrace(args.replay)
+        showExploration(forward,path,reverse,args.render,args.cells_per_frame,args.max_frames,
+                        loadMap(args.map,resolution=args.resolution)[1])
+    elif args.ygoal is None:
+        parser.error("the intial and goal points are required unless --batch or --replay is given")
+    else:
+        mainAlgo(args.xinit,args.yinit,args.xgoal,args.ygoal,fieldCache=args.field_cache,mode=args.mode,
+                 render=args.render,cellsPerFrame=args.cells_per_frame,maxFrames=args.max_frames,trace=args.trace,
+                 viz=not args.no_viz,mapFile=args.map,clusterSize=args.cluster_size,
+                 radius=args.radius,clearance=args.clearance,stats=args.stats,profile=args.profile,
+                 profileOutput=args.profile_output,queue=args.queue,fieldEngine=args.field_engine,
+                 resolution=args.resolution,packed=args.packed,tileSize=args.tile_size)
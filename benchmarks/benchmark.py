@@ -0,0 +1,258 @@
+"""
+    This scipt benchmarks the planner without any visualization on a fixed set of queries.
+    The queries are the sample of the README, queries passing close to the obstacles, unreachable goals
+    and long diagonals on the default map, and queries on larger maps generated from a fixed seed.
+    For every query and search mode it records the wall time, nodes expanded, heap operations and peak
+    memory of the search, and for every map the time to compute the full cost field from one point with each
+    field engine. It writes the results as JSON and compares them with a stored baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pathplanning import FIELD_ENGINES,QUEUES,SEARCH_MODES,Planner,compileMap,readMapFile,DEFAULT_MAP
+
+
+#baseline the results are compared with by default
+BASELINE=os.path.join(os.path.dirname(os.path.abspath(__file__)),"baseline.json")
+
+#a query is slower than its baseline if it takes this much longer, and at least MIN_SLOWDOWN seconds longer
+#as the time of the shortest queries is mostly noise, the other measures have to match exactly
+TIME_TOLERANCE=0.25
+MIN_SLOWDOWN=0.005
+
+
+def defaultMap() -> dict:
+    return readMapFile(DEFAULT_MAP)
+
+
+def enclosedMap() -> dict:
+    #default map with a square ring around (320,70), so the cells inside the ring can not be reached
+    spec=defaultMap()
+    ring=[[290,40],[350,40],[350,100],[290,100],[290,40],[300,50],[300,90],[340,90],[340,50],[300,50]]
+    spec["obstacles"].append({"type":"polygon","points":ring})
+    return spec
+
+
+def generatedMap(size: int,obstacles: int,seed: int) -> dict:
+    """
+    This function generates a square map with random rectangles and circles
+
+    Args:
+        size (int): width and height of the map in cells
+        obstacles (int): number of obstacles
+        seed (int): seed of the random generator, the same seed always gives the same map
+
+    Returns:
+        dict: the map description (see readMapFile)
+    """
+    rng=np.random.default_rng(seed)
+    spec={"width":size,"height":size,"clearance":2,"border":True,"obstacles":list()}
+    for _ in range(obstacles):
+        x,y=rng.uniform(0,size,2).round(1).tolist()
+        if rng.random()<0.7:
+            w,h=rng.uniform(5,size/12,2).round(1).tolist()
+            spec["obstacles"].append({"type":"polygon","points":[[x,y],[x+w,y],[x+w,y+h],[x,y+h]]})
+        else:
+            spec["obstacles"].append({"type":"circle","center":[x,y],"radius":round(float(rng.uniform(3,size/30)),1)})
+    return spec
+
+
+def freeQueries(occupancy: np.ndarray,count: int,seed: int) -> list:
+    #random pairs of free cells, the same seed always gives the same pairs
+    rng=np.random.default_rng(seed)
+    free=np.argwhere(~occupancy)
+    pairs=rng.integers(0,len(free),(count,2))
+    return [((int(free[a][1]),int(free[a][0])),(int(free[b][1]),int(free[b][0]))) for a,b in pairs]
+
+
+def cornerQuery(occupancy: np.ndarray) -> tuple:
+    #the free cells closest to the lower left and the upper right corner, a diagonal across the whole map
+    free=np.argwhere(~occupancy)
+    height,width=occupancy.shape
+    first=free[np.argmin(free[:,0]+free[:,1])]
+    last=free[np.argmin((height-free[:,0])+(width-free[:,1]))]
+    return (int(first[1]),int(first[0])),(int(last[1]),int(last[0]))
+
+
+def benchmarkCases(large: bool = False) -> list:
+    """
+    This function builds the maps and queries of the benchmark
+
+    Args:
+        large (bool): also include the 2000x2000 map
+
+    Returns:
+        list: (map name, occupancy grid, list of (case name, start, goal)) for every map
+    """
+    cases=list()
+    occupancy,_=compileMap(defaultMap())
+    cases.append(("default",occupancy,[
+        ("readme",(105,50),(200,185)),
+        ("around_circle",(300,139),(300,231)),
+        ("around_hexagon",(158,100),(242,100)),
+        ("long_diagonal",(6,6),(394,244)),
+    ]))
+    occupancy,_=compileMap(enclosedMap())
+    cases.append(("enclosed",occupancy,[
+        ("unreachable_goal",(105,50),(320,70)),
+        ("unreachable_start",(320,70),(105,50)),
+    ]))
+    for size,obstacles,seed in [(1000,150,1)]+([(2000,600,2)] if large else []):
+        occupancy,_=compileMap(generatedMap(size,obstacles,seed))
+        queries=[("corner_to_corner",)+cornerQuery(occupancy)]
+        queries+=[("random_%d"%i,)+query for i,query in enumerate(freeQueries(occupancy,2,seed))]
+        cases.append(("generated_%d"%size,occupancy,queries))
+    return cases
+
+
+def runBenchmark(cases: list,modes,repeats: int = 3,queues=QUEUES) -> list:
+    """
+    This function plans every query of the benchmark in every mode
+
+    Args:
+        cases (list): the maps and queries (see benchmarkCases)
+        modes: search modes to benchmark
+        queues: priority queues to benchmark, the bucket queue only with the dijkstra mode
+        repeats (int): number of times every query is planned, the shortest wall time is kept as the others
+                       only add the noise of the machine
+
+    Returns:
+        list: one dict per query, mode and queue with its cost, path length, nodes expanded, heap operations,
+              peak memory of the search in bytes and wall time in seconds
+    """
+    results=list()
+    for mapName,occupancy,queries in cases:
+        planner=Planner(occupancy)
+        for name,start,goal in queries:
+            for mode,queue in [(mode,queue) for mode in modes for queue in queues if queue=="heap" or mode=="dijkstra"]:
+                times=list()
+                for _ in range(repeats):
+                    begin=time.perf_counter()
+                    cost,path=planner.plan(start,goal,mode,queue=queue)
+                    times.append(time.perf_counter()-begin)
+                memory=planner.state.memoryUsage()
+                if mode=="bidirectional":
+                    memory+=planner.reverseState.memoryUsage()
+                result={"map":mapName,"case":name,"mode":mode,"queue":queue,"start":list(start),"goal":list(goal),
+                        "cost":None if cost is None else round(cost,6),"pathLength":len(path),
+                        "expanded":planner.expanded,"heapOps":planner.heapOps,"peakMemory":memory,
+                        "seconds":min(times)}
+                print("%-14s %-18s %-13s %-6s cost %-10s expanded %8d heapOps %8d %8.1f KiB %8.4f s"%(
+                      mapName,name,mode,queue,result["cost"],result["expanded"],result["heapOps"],memory/1024,result["seconds"]),
+                      file=sys.stderr)
+                results.append(result)
+    return results
+
+
+def runFieldBenchmark(cases: list,engines=FIELD_ENGINES,repeats: int = 3) -> list:
+    """
+    This function computes the full cost field from the start of the first query of every map with every engine
+
+    Args:
+        cases (list): the maps and queries (see benchmarkCases)
+        engines: field engines to benchmark
+        repeats (int): number of times every field is computed, the shortest wall time is kept
+
+    Returns:
+        list: one dict per map and engine in the layout of runBenchmark, with the mode field and the engine as queue
+    """
+    results=list()
+    for mapName,occupancy,queries in cases:
+        planner=Planner(occupancy)
+        name,start,_=queries[0]
+        for engine in engines:
+            times=list()
+            for _ in range(repeats):
+                begin=time.perf_counter()
+                cost,_=planner.costField(start,engine)
+                times.append(time.perf_counter()-begin)
+            reached=cost[np.isfinite(cost)]
+            result={"map":mapName,"case":"field_from_"+name,"mode":"field","queue":engine,"start":list(start),"goal":None,
+                    "cost":round(float(reached.max()),6),"pathLength":0,"expanded":planner.state.expanded,
+                    "heapOps":planner.state.heapOps,"peakMemory":planner.state.memoryUsage(),"seconds":min(times)}
+            print("%-14s %-18s %-13s %-9s largest cost %-10s closed %8d %8.4f s"%(
+                  mapName,result["case"],"field",engine,result["cost"],result["expanded"],result["seconds"]),file=sys.stderr)
+            results.append(result)
+    return results
+
+
+def compare(results: list,baseline: list,tolerance: float = TIME_TOLERANCE) -> list:
+    """
+    This function compares the results with a baseline.
+    A different cost is a wrong result, more nodes expanded, heap operations or memory is a regression
+    of the search, and a wall time more than the tolerance (and MIN_SLOWDOWN) above the baseline is a slowdown.
+
+    Args:
+        results (list): results of runBenchmark
+        baseline (list): results of an earlier run
+        tolerance (float): allowed relative increase of the wall time
+
+    Returns:
+        list: a message for every regression, empty if there is none
+    """
+    previous={(r["map"],r["case"],r["mode"],r.get("queue","heap")):r for r in baseline}
+    regressions=list()
+    for result in results:
+        key=(result["map"],result["case"],result["mode"],result["queue"])
+        if key not in previous:
+            continue
+        old=previous[key]
+        name="%s/%s/%s/%s"%key
+        if result["cost"]!=old["cost"]:
+            regressions.append("%s: cost %s, baseline %s"%(name,result["cost"],old["cost"]))
+        for measure in ("expanded","heapOps","peakMemory"):
+            if result[measure]>old[measure]:
+                regressions.append("%s: %s %d, baseline %d"%(name,measure,result[measure],old[measure]))
+        if result["seconds"]>old["seconds"]*(1+tolerance) and result["seconds"]-old["seconds"]>MIN_SLOWDOWN:
+            regressions.append("%s: %.4f s, baseline %.4f s (+%.0f%%)"%(
+                name,result["seconds"],old["seconds"],100*(result["seconds"]/old["seconds"]-1)))
+    return regressions
+
+
+#Program starts execution from here
+if __name__=="__main__":
+    parser=argparse.ArgumentParser(description="Benchmark of the planner on a fixed set of queries")
+    parser.add_argument("--modes",nargs="+",choices=SEARCH_MODES,default=list(SEARCH_MODES),help="search modes, all by default")
+    parser.add_argument("--queues",nargs="+",choices=QUEUES,default=list(QUEUES),help="priority queues of the dijkstra mode, all by default")
+    parser.add_argument("--engines",nargs="+",choices=FIELD_ENGINES,default=list(FIELD_ENGINES),help="cost field engines, all by default")
+    parser.add_argument("--repeats",type=int,default=3,help="number of runs of every query, the shortest time is kept")
+    parser.add_argument("--large",action="store_true",help="also benchmark the 2000x2000 generated map")
+    parser.add_argument("--output",metavar="FILE",help="write the results as JSON to FILE instead of stdout")
+    parser.add_argument("--baseline",metavar="FILE",default=BASELINE,help="baseline to compare with, benchmarks/baseline.json by default")
+    parser.add_argument("--tolerance",type=float,default=TIME_TOLERANCE,help="allowed relative increase of the wall time, 0.25 by default")
+    parser.add_argument("--save-baseline",action="store_true",help="store the results as the new baseline instead of comparing")
+    args=parser.parse_args()
+
+    cases=benchmarkCases(args.large)
+    results=runBenchmark(cases,args.modes,args.repeats,args.queues)+runFieldBenchmark(cases,args.engines,args.repeats)
+    report={"environment":{"python":platform.python_version(),"numpy":np.__version__,"machine":platform.machine(),
+                           "processor":platform.processor(),"system":platform.system()},
+            "results":results}
+
+    if args.save_baseline:
+        with open(args.baseline,"w") as file:
+            json.dump(report,file,indent=1)
+        print("Baseline written to",args.baseline,file=sys.stderr)
+        sys.exit(0)
+
+    if args.output is not None:
+        with open(args.output,"w") as file:
+            json.dump(report,file,indent=1)
+    else:
+        print(json.dumps(report,indent=1))
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            regressions=compare(results,json.load(file)["results"],args.tolerance)
+        for regression in regressions:
+            print("REGRESSION",regression,file=sys.stderr)
+        print("%d regressions against %s"%(len(regressions),args.baseline),file=sys.stderr)
+        sys.exit(1 if regressions else 0)
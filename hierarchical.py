@@ -0,0 +1,372 @@
+"""
+    This module is the hierarchical path planning (HPA*) for large maps.
+    The occupancy grid is split into square clusters. The entrances between neighbouring clusters become the
+    nodes of an abstract graph whose edges are the costs of crossing the clusters, computed once per map.
+    A query is searched on the abstract graph and only the clusters on the chosen route are refined into cells.
+    The paths are close to optimal but not always optimal, as they pass the clusters through the entrances.
+"""
+
+import numpy as np
+from heapq import heappop,heappush
+import os
+
+from pathplanning import CACHE_DIR,Planner,occupancyHash,pathCost
+
+
+#entrances with at least this many free cells get a transition at each end instead of one in the middle
+LONG_ENTRANCE=6
+
+#version of the abstract graph in the name of the cached files, raised when the graph is built differently
+#so a graph cached by an older version is built again
+GRAPH_VERSION=2
+
+
+#Class for the hierarchical planning on one map
+class HierarchicalPlanner:
+
+    #Constructor takes the occupancy grid of the map and the size of the clusters in cells
+    #the abstract graph is built by preprocess, or read by load
+    def __init__(self,occupancy: np.ndarray,clusterSize: int = 16):
+        self.obstacleMap=np.ascontiguousarray(occupancy,dtype=np.bool_)
+        self.height,self.width=occupancy.shape
+        self.clusterSize=clusterSize
+        self.mapHash=occupancyHash(self.obstacleMap)
+
+        #abstract graph, every node is the flat index of a cell next to a cluster border
+        #edges maps a node to a dict of its neighbours and the cost to reach them
+        #clusterNodes maps a cluster to the list of its nodes
+        self.edges=dict()
+        self.clusterNodes=dict()
+
+        #one planner on the cells of a cluster, reused for every cluster by changing its obstacles,
+        #and the cluster it holds, so the memory does not grow with the number of clusters
+        self.scratch=None
+        self.scratchCluster=None
+
+        #number of abstract and cell nodes expanded by the last query
+        self.expanded=0
+
+    @classmethod
+    def cached(cls,occupancy: np.ndarray,clusterSize: int = 16,cacheDir: str = CACHE_DIR):
+        """
+        This function returns the hierarchical planner of a map, reading its abstract graph from the cache
+        if the map was preprocessed before with the same cluster size, and preprocessing and storing it otherwise
+
+        Args:
+            occupancy (np.ndarray): occupancy grid of the map
+            clusterSize (int): size of the clusters in cells
+            cacheDir (str): directory of the preprocessed maps
+
+        Returns:
+            HierarchicalPlanner: the planner with its abstract graph
+        """
+        hierarchy=cls(occupancy,clusterSize)
+        path=os.path.join(cacheDir,"hpa%d_%s_%d.npz"%(GRAPH_VERSION,hierarchy.mapHash,clusterSize))
+        if os.path.exists(path):
+            hierarchy.load(path)
+        else:
+            hierarchy.preprocess()
+            os.makedirs(cacheDir,exist_ok=True)
+            hierarchy.save(path)
+        return hierarchy
+
+    #checks wether the point lies in obstacle space or outside the map
+    def isObstacle(self,x: int,y: int) -> bool:
+        if not (0<=x<self.width and 0<=y<self.height):
+            return True
+        return bool(self.obstacleMap[y,x])
+
+    def cluster(self,index: int) -> tuple:
+        #(column,row) of the cluster of a cell
+        y,x=divmod(index,self.width)
+        return x//self.clusterSize,y//self.clusterSize
+
+    def clusterPlanner(self,cluster: tuple):
+        """
+        This function returns the planner restricted to the cells of a cluster.
+        It works on a copy of the cluster surrounded by obstacle cells, so a cell (x,y) of the map is the cell
+        (x-x0+1,y-y0+1) of the planner, where (x0,y0) is the lower left cell of the cluster.
+        The same planner is used for every cluster, only the cells that differ from the cluster it held are
+        changed, so it is only valid until the next call.
+
+        Args:
+            cluster (tuple): (column,row) of the cluster
+
+        Returns:
+            Planner,int,int: the planner and the x0, y0 of the cluster
+        """
+        size=self.clusterSize
+        x0,y0=cluster[0]*size,cluster[1]*size
+        if self.scratch is None:
+            self.scratch=Planner(np.ones((size+2,size+2),dtype=np.bool_))
+        if cluster!=self.scratchCluster:
+            #the clusters at the edge of the map are smaller, their missing cells are obstacles
+            window=np.ones((size,size),dtype=np.bool_)
+            cells=self.obstacleMap[y0:y0+size,x0:x0+size]
+            window[:cells.shape[0],:cells.shape[1]]=cells
+            current=self.scratch.obstacleMap[1:-1,1:-1]
+            blocked=np.argwhere(window&~current)+1
+            freed=np.argwhere(~window&current)+1
+            self.scratch.updateMap(blocked[:,::-1].tolist(),freed[:,::-1].tolist())
+            self.scratchCluster=cluster
+        return self.scratch,x0,y0
+
+    def clusterCosts(self,index: int,targets) -> dict:
+        """
+        This function finds the cost of the optimal path inside the cluster of a cell to other cells of the cluster
+
+        Args:
+            index (int): flat index of the cell
+            targets: flat indexes of the cells of the same cluster
+
+        Returns:
+            dict: the cost to every target that can be reached inside the cluster
+        """
+        planner,x0,y0=self.clusterPlanner(self.cluster(index))
+        y,x=divmod(index,self.width)
+        planner.search((y-y0+1)*planner.width+(x-x0+1),-1)
+        self.expanded+=planner.state.expanded
+        costs=dict()
+        for target in targets:
+            ty,tx=divmod(target,self.width)
+            cost=planner.state.cost[(ty-y0+1)*planner.width+(tx-x0+1)]
+            if cost!=np.inf and target!=index:
+                costs[target]=float(cost)
+        return costs
+
+    def addEdge(self,a: int,b: int,cost: float):
+        self.edges.setdefault(a,dict())
+        self.edges.setdefault(b,dict())
+        if cost<self.edges[a].get(b,np.inf):
+            self.edges[a][b]=cost
+            self.edges[b][a]=cost
+
+    def preprocess(self):
+        """
+        This function builds the abstract graph.
+        Along every border between two clusters the runs of cell pairs that are free on both sides are the entrances.
+        Each entrance gets one transition in its middle, or one at each end if it is long, which is an edge of cost 1
+        between the two cells of the pair. As the diagonal actions may cut corners, two free cells can also be
+        neighbours across a border only diagonally, with both cell pairs between them blocked on one side. Such a
+        crossing is not part of any entrance and gets a transition of its own, an edge of cost 1.4.
+        The transitions of a cluster are then connected by the costs of the optimal paths between them inside the cluster.
+        """
+        self.edges=dict()
+        free=~self.obstacleMap
+        size=self.clusterSize
+
+        #borders between horizontal neighbours (x-1 | x) and vertical neighbours (y-1 | y)
+        for x in range(size,self.width,size):
+            both=free[:,x-1]&free[:,x]
+            for y0 in range(0,self.height,size):
+                for y in self.transitions(both[y0:y0+size]):
+                    self.addEdge((y0+y)*self.width+x-1,(y0+y)*self.width+x,1.0)
+            for y,dy in self.diagonalCrossings(free[:,x-1],free[:,x],both):
+                self.addEdge(y*self.width+x-1,(y+dy)*self.width+x,1.4)
+        for y in range(size,self.height,size):
+            both=free[y-1,:]&free[y,:]
+            for x0 in range(0,self.width,size):
+                for x in self.transitions(both[x0:x0+size]):
+                    self.addEdge((y-1)*self.width+x0+x,y*self.width+x0+x,1.0)
+            for x,dx in self.diagonalCrossings(free[y-1,:],free[y,:],both):
+                self.addEdge((y-1)*self.width+x,y*self.width+x+dx,1.4)
+
+        #connecting the transitions inside every cluster
+        self.indexClusters()
+        for nodes in self.clusterNodes.values():
+            for node in nodes:
+                for target,cost in self.clusterCosts(node,nodes).items():
+                    self.addEdge(node,target,cost)
+        self.expanded=0
+
+    def indexClusters(self):
+        #groups the nodes of the abstract graph by cluster
+        self.clusterNodes=dict()
+        for node in self.edges:
+            self.clusterNodes.setdefault(self.cluster(node),list()).append(node)
+
+    @staticmethod
+    def transitions(both: np.ndarray) -> list:
+        #positions of the transitions along one cluster border, given which cell pairs are free on both sides
+        positions=list()
+        start=None
+        for i,isFree in enumerate(list(both)+[False]):
+            if isFree and start is None:
+                start=i
+            elif not isFree and start is not None:
+                if i-start>=LONG_ENTRANCE:
+                    positions.extend((start,i-1))
+                else:
+                    positions.append((start+i-1)//2)
+                start=None
+        return positions
+
+    @staticmethod
+    def diagonalCrossings(near: np.ndarray,far: np.ndarray,both: np.ndarray) -> list:
+        #diagonal steps across a whole border, given the free cells on both sides and which cell pairs are free on both
+        #sides, from position i on the near side to i+1 or i-1 on the far side, where neither pair at i or i+1 is free,
+        #as (i,1) or (i,-1). The crossings at the ends of the border segments lead to a diagonal neighbour cluster.
+        unpaired=~(both[:-1]|both[1:])
+        up=np.flatnonzero(near[:-1]&far[1:]&unpaired)
+        down=np.flatnonzero(near[1:]&far[:-1]&unpaired)+1
+        return [(int(i),1) for i in up]+[(int(i),-1) for i in down]
+
+    def save(self,path: str):
+        #writes the abstract graph as arrays of edges, with the map hash and cluster size it was built for
+        a,b,cost=list(),list(),list()
+        for node,neighbours in self.edges.items():
+            for other,edgeCost in neighbours.items():
+                if node<other:
+                    a.append(node)
+                    b.append(other)
+                    cost.append(edgeCost)
+        with open(path+".tmp","wb") as file:
+            np.savez(file,a=np.array(a,dtype=np.int64),b=np.array(b,dtype=np.int64),cost=np.array(cost),
+                     mapHash=np.array(self.mapHash),clusterSize=np.array(self.clusterSize))
+        os.replace(path+".tmp",path)
+
+    def load(self,path: str):
+        #reads an abstract graph written by save
+        with np.load(path) as data:
+            if str(data["mapHash"])!=self.mapHash or int(data["clusterSize"])!=self.clusterSize:
+                raise ValueError("%s was preprocessed for another map or cluster size"%path)
+            self.edges=dict()
+            for a,b,cost in zip(data["a"].tolist(),data["b"].tolist(),data["cost"].tolist()):
+                self.addEdge(a,b,cost)
+        self.indexClusters()
+
+    def plan(self,start,goal):
+        """
+        This function finds a path between intial and goal point on the abstract graph and refines it into cells
+
+        Args:
+            start (tuple): (x,y) coordinate of the intial point
+            goal (tuple): (x,y) coordinate of the goal point
+
+        Raises:
+            ValueError: if the intial or goal point lies in obstacle space
+
+        Returns:
+            float,list: cost of the path and the (x,y) coordinates on it from start to goal
+                        None,[] if there is no path between the points
+        """
+        if self.isObstacle(*start):
+            raise ValueError("Intial point in obstacle space")
+        if self.isObstacle(*goal):
+            raise ValueError("Goal point in obstacle space")
+        self.expanded=0
+        initIndex=start[1]*self.width+start[0]
+        goalIndex=goal[1]*self.width+goal[0]
+
+        #the intial and goal cells are connected to the transitions of their clusters for this query only
+        temporary=dict()
+        for index in (initIndex,goalIndex):
+            nodes=list(self.clusterNodes.get(self.cluster(index),[]))
+            if index==initIndex and self.cluster(goalIndex)==self.cluster(initIndex):
+                nodes.append(goalIndex)
+            temporary[index]=self.clusterCosts(index,nodes)
+
+        #a short path between neighbouring clusters often does not go through their transitions
+        #so it is also searched on the cells of the two clusters and the cheaper path is kept
+        local=None
+        (ax,ay),(bx,by)=self.cluster(initIndex),self.cluster(goalIndex)
+        if abs(ax-bx)<=1 and abs(ay-by)<=1:
+            local=self.windowPlan(initIndex,goalIndex,(min(ax,bx),min(ay,by)),(max(ax,bx),max(ay,by)))
+
+        route=self.searchAbstract(initIndex,goalIndex,temporary)
+        if route is None:
+            return local if local is not None else (None,[])
+
+        #refining every edge of the route, the edges inside a cluster are searched again on its cells
+        path=[initIndex]
+        for a,b in zip(route,route[1:]):
+            if self.cluster(a)!=self.cluster(b):
+                path.append(b)
+                continue
+            planner,x0,y0=self.clusterPlanner(self.cluster(a))
+            ay,ax=divmod(a,self.width)
+            by,bx=divmod(b,self.width)
+            _,segment=planner.plan((ax-x0+1,ay-y0+1),(bx-x0+1,by-y0+1))
+            self.expanded+=planner.expanded
+            path.extend((y+y0-1)*self.width+x+x0-1 for x,y in segment[1:])
+
+        cost=pathCost(path,self.width)
+        if local is not None and local[0]<=cost:
+            return local
+        return cost,[(index%self.width,index//self.width) for index in path]
+
+    def windowPlan(self,initIndex: int,goalIndex: int,first: tuple,last: tuple):
+        """
+        This function finds the optimal path restricted to the cells of a block of clusters
+
+        Args:
+            initIndex (int): flat index of the intial cell
+            goalIndex (int): flat index of the goal cell
+            first (tuple): (column,row) of the lower left cluster of the block
+            last (tuple): (column,row) of the upper right cluster of the block
+
+        Returns:
+            float,list: cost of the path and the (x,y) coordinates on it, None if there is no path inside the block
+        """
+        x0,y0=first[0]*self.clusterSize,first[1]*self.clusterSize
+        x1,y1=(last[0]+1)*self.clusterSize,(last[1]+1)*self.clusterSize
+        planner=Planner(np.pad(self.obstacleMap[y0:y1,x0:x1],1,constant_values=True))
+        iy,ix=divmod(initIndex,self.width)
+        gy,gx=divmod(goalIndex,self.width)
+        cost,path=planner.plan((ix-x0+1,iy-y0+1),(gx-x0+1,gy-y0+1),"astar")
+        self.expanded+=planner.expanded
+        if cost is None:
+            return None
+        return cost,[(x+x0-1,y+y0-1) for x,y in path]
+
+    def searchAbstract(self,initIndex: int,goalIndex: int,temporary: dict):
+        """
+        This is the A* Algorithm on the abstract graph with the octile distance as heuristic
+
+        Args:
+            initIndex (int): flat index of the intial cell
+            goalIndex (int): flat index of the goal cell
+            temporary (dict): edges of the intial and goal cell to the transitions of their clusters
+
+        Returns:
+            list: the flat indexes of the nodes on the route from start to goal, None if there is no route
+        """
+        gy,gx=divmod(goalIndex,self.width)
+
+        def heuristic(index):
+            y,x=divmod(index,self.width)
+            dx,dy=abs(x-gx),abs(y-gy)
+            return 0.4*min(dx,dy)+max(dx,dy)
+
+        #edges reaching the goal from the transitions of its cluster
+        toGoal=temporary[goalIndex]
+
+        cost={initIndex:0.0}
+        parent={initIndex:None}
+        closed=set()
+        q=[(heuristic(initIndex),initIndex)]
+        while q:
+            _,node=heappop(q)
+            if node in closed:
+                continue
+            closed.add(node)
+            self.expanded+=1
+            if node==goalIndex:
+                route=list()
+                while node is not None:
+                    route.append(node)
+                    node=parent[node]
+                return route[::-1]
+
+            candidates=list(self.edges.get(node,dict()).items())
+            if node==initIndex:
+                candidates.extend(temporary[initIndex].items())
+            if node in toGoal:
+                candidates.append((goalIndex,toGoal[node]))
+            for child,step in candidates:
+                newcost=cost[node]+step
+                if child not in closed and newcost<cost.get(child,np.inf):
+                    cost[child]=newcost
+                    parent[child]=node
+                    heappush(q,(newcost+heuristic(child),child))
+        return None
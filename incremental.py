@@ -0,0 +1,244 @@
+"""
+    This module is the incremental replanning (D* Lite) for maps whose obstacles change while the robot moves.
+    The search runs backwards from the goal and keeps its state between queries. When cells become blocked
+    or free only the cells whose cost to the goal changed are searched again, and when the robot moves
+    the costs already found stay valid, so the updated optimal path is found without a search from scratch.
+"""
+
+import numpy as np
+from heapq import heappop,heappush
+from array import array
+
+from pathplanning import ACTIONS,COST_SCALE,loadMap,pathCost
+
+
+#the costs are kept as integers (scaled by COST_SCALE), 10 for a straight and 14 for a diagonal action,
+#so that the cost of a cell can be compared exactly with the cost through its neighbours
+INF=2**31-1
+
+
+#Class for replanning the path to one goal on a map whose obstacles change
+class IncrementalPlanner:
+
+    #Constructor takes the occupancy grid of the map, the default map is loaded if none is given
+    #the grid is copied as the obstacles are changed by update, its border cells must stay obstacles
+    def __init__(self,occupancy: np.ndarray = None):
+        if occupancy is None:
+            occupancy,_=loadMap()
+        self.obstacleMap=np.array(occupancy,dtype=np.bool_)
+        self.height,self.width=occupancy.shape
+        self.obstacleCells=memoryview(self.obstacleMap.reshape(-1).view(np.uint8))
+        self.moves=[(dy*self.width+dx,int(round(step*COST_SCALE))) for dx,dy,step in ACTIONS]
+
+        #cost to the goal (g) and its one step lookahead (rhs) of every cell
+        #a cell whose g and rhs differ is inconsistent and is on the heap with the key stored in keys
+        self.g=None
+        self.rhs=None
+        self.keys=dict()
+        self.q=list()
+
+        #goal of the search, the last intial cell and the offset added to the keys as the intial cell moves
+        self.goalIndex=-1
+        self.lastIndex=-1
+        self.km=0
+
+        #number of cells expanded and of pushes and pops on the heap by the last query
+        self.expanded=0
+        self.heapOps=0
+
+    #checks wether the point lies in obstacle space or outside the map
+    def isObstacle(self,x: int,y: int) -> bool:
+        if not (0<=x<self.width and 0<=y<self.height):
+            return True
+        return bool(self.obstacleMap[y,x])
+
+    def heuristic(self,a: int,b: int) -> int:
+        #octile distance between two cells with the integer costs, 14*min(dx,dy)+10*(max(dx,dy)-min(dx,dy))
+        ay,ax=divmod(a,self.width)
+        by,bx=divmod(b,self.width)
+        dx,dy=abs(ax-bx),abs(ay-by)
+        return 4*min(dx,dy)+10*max(dx,dy)
+
+    def plan(self,start,goal):
+        """
+        This function finds the optimal path between intial and goal point on the current obstacles.
+        The search is only started again from scratch when the goal changes, otherwise the state of the
+        previous query is repaired. The number of cells expanded is left in expanded and the number of
+        heap operations in heapOps.
+
+        Args:
+            start (tuple): (x,y) coordinate of the intial point
+            goal (tuple): (x,y) coordinate of the goal point
+
+        Raises:
+            ValueError: if the intial or goal point lies in obstacle space
+
+        Returns:
+            float,list: cost of the optimal path and the (x,y) coordinates on it from start to goal
+                        None,[] if there is no path between the points
+        """
+        if self.isObstacle(*start):
+            raise ValueError("Intial point in obstacle space")
+        if self.isObstacle(*goal):
+            raise ValueError("Goal point in obstacle space")
+
+        initIndex=start[1]*self.width+start[0]
+        goalIndex=goal[1]*self.width+goal[0]
+        if goalIndex!=self.goalIndex:
+            self.lastIndex=initIndex
+            self.reset(goalIndex)
+        else:
+            #the keys on the heap were computed with the heuristic to the last intial cell,
+            #km keeps them lower bounds of the keys with the heuristic to the new one
+            self.km+=self.heuristic(self.lastIndex,initIndex)
+            self.lastIndex=initIndex
+
+        self.computeShortestPath(initIndex)
+        if self.g[initIndex]==INF:
+            return None,[]
+        path=self.pathFrom(initIndex)
+
+        #the cost is added up along the path as for the other planners
+        width=self.width
+        return pathCost(path,width),[(i%width,i//width) for i in path]
+
+    def update(self,blocked=(),freed=()):
+        """
+        This function changes the obstacles of the map. The cells next to the changed ones are put on the heap
+        if their cost has to be repaired, which is done by the next plan.
+
+        Args:
+            blocked: (x,y) coordinates of the cells that became obstacles
+            freed: (x,y) coordinates of the cells that became free
+
+        Raises:
+            ValueError: if a cell is outside of the map or on its border, which always stays an obstacle
+        """
+        changed=list()
+        for cells,value in ((blocked,True),(freed,False)):
+            for x,y in cells:
+                if not (0<x<self.width-1 and 0<y<self.height-1):
+                    raise ValueError("Cell (%d, %d) is not inside the border of the map"%(x,y))
+                if self.obstacleMap[y,x]!=value:
+                    self.obstacleMap[y,x]=value
+                    changed.append(y*self.width+x)
+        if self.g is None:
+            return
+
+        #the cost through a changed cell changed for all its neighbours
+        for index in changed:
+            for cell in [index]+[index+offset for offset,_ in self.moves]:
+                if cell!=self.goalIndex:
+                    self.rhs[cell]=self.lookahead(cell)
+                    self.updateCell(cell)
+
+    def reset(self,goalIndex: int):
+        #starts the search from scratch from the goal cell
+        size=self.width*self.height
+        self.g=array('i',[INF])*size
+        self.rhs=array('i',[INF])*size
+        self.keys.clear()
+        self.q.clear()
+        self.goalIndex=goalIndex
+        self.km=0
+        self.rhs[goalIndex]=0
+        self.updateCell(goalIndex)
+
+    def key(self,index: int) -> tuple:
+        #cells are expanded in the order of the estimated cost of the path from the intial cell through them
+        cost=min(self.g[index],self.rhs[index])
+        if cost==INF:
+            return INF,INF
+        return cost+self.heuristic(self.lastIndex,index)+self.km,cost
+
+    def lookahead(self,index: int) -> int:
+        #the cheapest cost to the goal through one of the neighbours of a free cell
+        if self.obstacleCells[index]:
+            return INF
+        g=self.g
+        best=INF
+        for offset,step in self.moves:
+            neighbour=index+offset
+            if not self.obstacleCells[neighbour] and g[neighbour]!=INF and g[neighbour]+step<best:
+                best=g[neighbour]+step
+        return best
+
+    def updateCell(self,index: int):
+        #puts an inconsistent cell on the heap with its current key and takes a consistent one off it
+        #a cell whose key changed is pushed again, the entries with an older key are skipped when popped
+        if self.g[index]!=self.rhs[index]:
+            key=self.key(index)
+            if self.keys.get(index)!=key:
+                self.keys[index]=key
+                heappush(self.q,(key,index))
+                self.heapOps+=1
+        else:
+            self.keys.pop(index,None)
+
+    def topKey(self) -> tuple:
+        #smallest key on the heap, the stale entries on top of it are removed first
+        q=self.q
+        while q and self.keys.get(q[0][1])!=q[0][0]:
+            heappop(q)
+            self.heapOps+=1
+        return q[0][0] if q else (INF,INF)
+
+    def computeShortestPath(self,initIndex: int):
+        """
+        This function expands the inconsistent cells until the cost of the intial cell is known,
+        every cell on its optimal path to the goal is consistent then.
+
+        Args:
+            initIndex (int): flat index of the intial cell
+        """
+        g=self.g
+        rhs=self.rhs
+        obstacleCells=self.obstacleCells
+        moves=self.moves
+        goalIndex=self.goalIndex
+        self.expanded=0
+        self.heapOps=0
+
+        while self.topKey()<self.key(initIndex) or rhs[initIndex]!=g[initIndex]:
+            oldKey,index=heappop(self.q)
+            self.heapOps+=1
+            del self.keys[index]
+            newKey=self.key(index)
+            if oldKey<newKey:
+                #the key was computed before the intial cell moved, it goes back on the heap with the current one
+                self.updateCell(index)
+                continue
+            self.expanded+=1
+
+            if g[index]>rhs[index]:
+                #the cost of the cell went down, the cost through it is offered to its neighbours
+                g[index]=rhs[index]
+                for offset,step in moves:
+                    neighbour=index+offset
+                    if neighbour!=goalIndex and not obstacleCells[neighbour] and g[index]+step<rhs[neighbour]:
+                        rhs[neighbour]=g[index]+step
+                        self.updateCell(neighbour)
+            else:
+                #the cost of the cell went up, its neighbours that went through it look for a new one
+                oldCost=g[index]
+                g[index]=INF
+                for cell,step in [(index,0)]+[(index+offset,step) for offset,step in moves]:
+                    if cell!=goalIndex and (cell==index or rhs[cell]==oldCost+step):
+                        rhs[cell]=self.lookahead(cell)
+                    self.updateCell(cell)
+
+    def pathFrom(self,initIndex: int):
+        #follows the cheapest neighbours from the intial cell to the goal cell
+        g=self.g
+        path=[initIndex]
+        index=initIndex
+        while index!=self.goalIndex:
+            best=INF
+            for offset,step in self.moves:
+                neighbour=index+offset
+                if not self.obstacleCells[neighbour] and g[neighbour]!=INF and g[neighbour]+step<best:
+                    best=g[neighbour]+step
+                    following=neighbour
+            index=following
+            path.append(index)
+        return path
@@ -0,0 +1,2421 @@
+"""
+    This module is the solver of the path planning for the point robot.
+    It compiles the obstacle space of the map into an occupancy grid and finds the optimum path on it
+    with Dijkstras Algorithm (and the other search modes of Planner), using nothing but NumPy.
+    The visualization is in visualization.py and is only imported when it is asked for.
+"""
+
+import numpy as np
+from typing import List
+from heapq import heappop,heappush
+from array import array
+from collections import OrderedDict,deque
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+
+
+class SearchState:
+    
+    __slots__=("width","height","cost","parent","closed","order","expanded","heapPeak","heapOps","heapPushes","filled",
+               "queryId")
+    
+    #Constructor preallocates the state for a map of the given size
+    #cells are addressed by their flat index y*width+x
+    #blocked is the occupancy grid of the map, its obstacle cells are marked closed for good (see closed)
+    #a blocked PackedGrid is copied as it is into closed flags of one bit per cell, without unpacking it
+    def __init__(self,width: int,height: int,blocked: np.ndarray = None):
+        size=width*height
+        self.width=width
+        self.height=height
+        
+        #cost of coming to the cell (float32), parent flat index (int32) and closed flag (one byte) of every cell
+        #the obstacle cells are closed from the start and are never reset, as a search never reaches them,
+        #so one lookup of the closed flag tells the searches wether a neighbour can still be opened
+        self.cost=array('f',[np.inf])*size
+        self.parent=array('i',[-1])*size
+        if blocked is None:
+            self.closed=bytearray(size)
+        elif isinstance(blocked,PackedGrid):
+            self.closed=PackedGrid(blocked.bits.copy(),blocked.shape)
+        else:
+            self.closed=bytearray(np.ascontiguousarray(blocked,dtype=np.bool_).reshape(-1).view(np.uint8))
+        
+        #flat indices of the closed cells in the order they were closed, order[:expanded] is valid
+        self.order=array('i',[0])*size
+        self.expanded=0
+        
+        #largest number of entries the priority queue held during the search,
+        #the number of pushes and pops on it and the number of pushes alone
+        self.heapPeak=0
+        self.heapOps=0
+        self.heapPushes=0
+        
+        #flat indices of the cells whose cost and parent were filled in after the search,
+        #the cells between the jump points of the jump point search
+        self.filled=list()
+        
+        #number of the search the state holds, raised by every reset
+        self.queryId=0
+    
+    #numpy views of the state arrays shaped like the map and indexed as [y,x]
+    def costGrid(self) -> np.ndarray:
+        return np.frombuffer(self.cost,dtype=np.float32).reshape(self.height,self.width)
+    
+    def parentGrid(self) -> np.ndarray:
+        return np.frombuffer(self.parent,dtype=np.int32).reshape(self.height,self.width)
+    
+    def closedGrid(self) -> np.ndarray:
+        if isinstance(self.closed,PackedGrid):
+            return self.closed.unpack()
+        return np.frombuffer(self.closed,dtype=np.bool_).reshape(self.height,self.width)
+    
+    #flat indices of the closed cells in the order they were closed
+    def closedOrder(self) -> np.ndarray:
+        return np.frombuffer(self.order,dtype=np.int32)[:self.expanded]
+    
+    #resets the state of the cells touched by the last search, these are the closed cells and the cells left in the heap
+    #the time taken is proportional to the cells the search touched and not to the size of the map
+    #the flat index of the cell is the last item of every heap entry
+    def reset(self,heap: list):
+        touched=self.closedOrder()
+        if heap:
+            touched=np.concatenate((touched,np.fromiter((entry[-1] for entry in heap),dtype=np.int32,count=len(heap))))
+        if self.filled:
+            touched=np.concatenate((touched,np.array(self.filled,dtype=np.int32)))
+        cost=np.frombuffer(self.cost,dtype=np.float32)
+        parent=np.frombuffer(self.parent,dtype=np.int32)
+        cost[touched]=np.inf
+        parent[touched]=-1
+        if isinstance(self.closed,PackedGrid):
+            self.closed.put(touched,False)
+        else:
+            np.frombuffer(self.closed,dtype=np.bool_)[touched]=False
+        heap.clear()
+        self.filled.clear()
+        self.queryId+=1
+        self.expanded=0
+        self.heapPeak=0
+        self.heapOps=0
+        self.heapPushes=0
+    
+    #divides the cost of every cell reached by the search, the closed cells and the cells left in the heap
+    def divideCosts(self,heap: list,divisor: float):
+        reached=np.unique(np.concatenate((self.closedOrder(),
+                                          np.fromiter((entry[-1] for entry in heap),dtype=np.int32,count=len(heap)))))
+        np.frombuffer(self.cost,dtype=np.float32)[reached]/=divisor
+    
+    #bytes used by the search: the per cell arrays and the priority queue at its largest
+    def memoryUsage(self) -> int:
+        closed=self.closed.nbytes if isinstance(self.closed,PackedGrid) else len(self.closed)
+        arrays=sum(len(a)*a.itemsize for a in (self.cost,self.parent,self.order))+closed
+        return arrays+self.heapPeak*self.heapEntryBytes()
+    
+    def heapEntryBytes(self) -> int:
+        #bytes of one entry of the priority queue, the tuple, its values and the pointer to it
+        return sys.getsizeof((0.0,0))+sys.getsizeof(0.0)+sys.getsizeof(self.width*self.height)+8
+
+
+#Class counting the reads of the cells by a search, see Planner.lookupView
+#it is only put in place of the cells when the lookups are counted, as every read becomes a method call
+class CountedCells:
+    
+    __slots__=("cells","name","count")
+    
+    def __init__(self,cells,name: str):
+        self.cells=cells
+        self.name=name
+        self.count=0
+    
+    def __getitem__(self,index: int):
+        self.count+=1
+        return self.cells[index]
+    
+    def __setitem__(self,index: int,value):
+        self.cells[index]=value
+
+
+#Class for an occupancy grid stored bit-packed, 8 cells per byte, for maps too fine or too large for a byte per cell
+#The bits are the ones of np.packbits on the grid (the first cell in the highest bit), so the hash is the same
+#It is indexed by the flat index y*width+x like the byte view of the grid and can be used in its place by Planner
+#A copy of it holds the closed flags of the search state of a packed map, see SearchState
+class PackedGrid:
+    
+    __slots__=("bits","cells","shape")
+    
+    #Constructor packs a boolean occupancy grid, or wraps the bits of one already packed when the shape is given
+    def __init__(self,occupancy: np.ndarray,shape: tuple = None):
+        if shape is None:
+            shape=occupancy.shape
+            occupancy=np.packbits(occupancy)
+        self.bits=occupancy
+        self.shape=tuple(shape)
+        self.cells=memoryview(occupancy)
+    
+    def __getitem__(self,index: int):
+        return self.cells[index>>3]&(128>>(index&7))
+    
+    def __setitem__(self,index: int,value):
+        if value:
+            self.cells[index>>3]|=128>>(index&7)
+        else:
+            self.cells[index>>3]&=~(128>>(index&7))&255
+    
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+    
+    def put(self,indices: np.ndarray,value: bool):
+        #sets the cells of an array of flat indices at once, a byte holding several of them is changed for each one
+        masks=(128>>(indices&7)).astype(np.uint8)
+        if value:
+            np.bitwise_or.at(self.bits,indices>>3,masks)
+        else:
+            np.bitwise_and.at(self.bits,indices>>3,~masks)
+    
+    def unpack(self) -> np.ndarray:
+        #boolean occupancy grid indexed as [y,x]
+        height,width=self.shape
+        return np.unpackbits(self.bits,count=height*width).view(np.bool_).reshape(height,width)
+
+
+#closed flag of a cell whose tile of a TiledOccupancy has not been marked in the search state yet
+UNKNOWN_CELL=2
+
+
+#Class for an occupancy grid computed in square tiles the first time one of their cells is read, for maps so large
+#that compiling all of them up front is wasted on queries that only search a small part of the map.
+#The obstacles are indexed in a uniform grid with one bucket per tile, so a tile only rasterizes the obstacles
+#near it, and the computed tiles are kept in a LRU cache of maxTiles tiles. The cells are the same as the ones
+#of loadMap, and it is indexed by the flat index y*width+x and can be used in place of the grid by Planner.
+class TiledOccupancy:
+    
+    #Constructor indexes the obstacles of the map description (see readMapFile), the default map if none is given
+    #radius, clearance and resolution are the ones of compileMap
+    def __init__(self,spec: dict = None,radius: float = 0.0,clearance: float = None,resolution: float = 1.0,
+                 tileSize: int = 64,maxTiles: int = 1024):
+        if spec is None:
+            spec=readMapFile(DEFAULT_MAP)
+        self.spec=scaleMap(spec,resolution)
+        self.width,self.height=int(self.spec["width"]),int(self.spec["height"])
+        self.shape=(self.height,self.width)
+        mapClearance=self.spec.get("clearance",0)
+        self.reach=radius*resolution+(mapClearance if clearance is None else clearance*resolution)
+        self.tileSize=tileSize
+        self.maxTiles=maxTiles
+        
+        #a cell is only in obstacle space if an obstacle is at most the reach away, so a tile is computed
+        #from the obstacles in a window margin cells larger than the tile on every side
+        self.margin=int(np.ceil(self.reach))+1
+        
+        #obstacles whose bounding box overlaps the window of a tile, by the (row, column) of the tile
+        self.index=dict()
+        rows,columns=(self.height-1)//tileSize,(self.width-1)//tileSize
+        for obstacle in self.spec.get("obstacles",[]):
+            xmin,ymin,xmax,ymax=obstacleBounds(obstacle,self.margin)
+            for ty in range(max(int(np.floor(ymin))//tileSize,0),min(int(np.ceil(ymax))//tileSize,rows)+1):
+                for tx in range(max(int(np.floor(xmin))//tileSize,0),min(int(np.ceil(xmax))//tileSize,columns)+1):
+                    self.index.setdefault((ty,tx),list()).append(obstacle)
+        
+        #computed tiles from the least to the most recently used, and the tiles changed by updates,
+        #which are kept as they can not be computed again from the map
+        self.tiles=OrderedDict()
+        self.changed=dict()
+        self.computed=0
+        
+        #the tile read last with its cells as a flat memoryview and its width, as a search reads the cells
+        #of one tile after another, most reads need neither the LRU cache nor indexing the tile with NumPy
+        self.lastKey=None
+        self.lastCells=None
+        self.lastWidth=0
+    
+    def __getitem__(self,index: int):
+        y,x=divmod(index,self.width)
+        size=self.tileSize
+        key=(y//size,x//size)
+        if key!=self.lastKey:
+            tile=self.tile(*key)
+            self.lastKey,self.lastCells,self.lastWidth=key,memoryview(tile.reshape(-1).view(np.uint8)),tile.shape[1]
+        return self.lastCells[(y%size)*self.lastWidth+x%size]
+    
+    def __setitem__(self,index: int,value):
+        y,x=divmod(index,self.width)
+        key=(y//self.tileSize,x//self.tileSize)
+        self.lastKey=None
+        if key not in self.changed:
+            self.changed[key]=self.tile(*key).copy()
+            self.tiles.pop(key,None)
+        self.changed[key][y%self.tileSize,x%self.tileSize]=bool(value)
+    
+    @property
+    def nbytes(self) -> int:
+        #bytes of the tiles held, computed and changed
+        return sum(tile.nbytes for tile in self.tiles.values())+sum(tile.nbytes for tile in self.changed.values())
+    
+    def tile(self,ty: int,tx: int) -> np.ndarray:
+        #occupancy of the tile in row ty and column tx of the tiles, computed if it is not cached
+        key=(ty,tx)
+        tile=self.changed.get(key)
+        if tile is not None:
+            return tile
+        tile=self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            return tile
+        tile=self.computeTile(ty,tx)
+        self.tiles[key]=tile
+        while len(self.tiles)>self.maxTiles:
+            self.tiles.popitem(last=False)
+        return tile
+    
+    def computeTile(self,ty: int,tx: int) -> np.ndarray:
+        """
+        This function computes the occupancy of one tile as mapField and inflate do for the whole map,
+        from the obstacles rasterized in the window around the tile and the distance to them
+
+        Args:
+            ty (int): row of the tile
+            tx (int): column of the tile
+
+        Returns:
+            np.ndarray: boolean occupancy of the cells of the tile indexed as [y,x], smaller at the edges of the map
+        """
+        width,height,size,margin=self.width,self.height,self.tileSize,self.margin
+        x0,y0=tx*size,ty*size
+        x1,y1=min(x0+size,width),min(y0+size,height)
+        
+        #the raw obstacles have the border at x=0, x=width, y=0 and y=height as in mapField
+        left,top=max(x0-margin,0),max(y0-margin,0)
+        right,bottom=min(x1+margin,width+1),min(y1+margin,height+1)
+        raw=np.zeros((bottom-top,right-left),dtype=np.bool_)
+        if self.spec.get("border",True):
+            for x in (0,width):
+                if left<=x<right:
+                    raw[:,x-left]=True
+            for y in (0,height):
+                if top<=y<bottom:
+                    raw[y-top,:]=True
+        for obstacle in self.index.get((ty,tx),()):
+            window,covered=obstacleRegion(obstacle,0,width,height,(left,top,min(right,width),min(bottom,height)))
+            if window is not None:
+                rows,columns=window
+                raw[rows.start-top:rows.stop-top,columns.start-left:columns.stop-left]|=covered
+        
+        tile=distanceTransform(raw)[y0-top:y1-top,x0-left:x1-left]<=self.reach
+        if y0==0:
+            tile[0,:]=True
+        if x0==0:
+            tile[:,0]=True
+        if y1==height:
+            tile[-1,:]=True
+        if x1==width:
+            tile[:,-1]=True
+        self.computed+=1
+        return tile
+    
+    def mark(self,closed: bytearray,indices):
+        #writes the occupancy of the tiles of the cells into the closed flags of a search state, see Planner.wavefront
+        size=self.tileSize
+        y,x=np.divmod(np.asarray(indices,dtype=np.int64).reshape(-1),self.width)
+        grid=np.frombuffer(closed,dtype=np.uint8).reshape(self.shape)
+        for key in set(zip((y//size).tolist(),(x//size).tolist())):
+            tile=self.tile(*key)
+            grid[key[0]*size:key[0]*size+tile.shape[0],key[1]*size:key[1]*size+tile.shape[1]]=tile
+    
+    def digest(self) -> bytes:
+        #hash of the map description, the reach and the changes, which determine every cell
+        digest=hashlib.sha1(json.dumps(self.spec,sort_keys=True).encode())
+        digest.update(repr(self.reach).encode())
+        for key in sorted(self.changed):
+            digest.update(repr(key).encode()+np.packbits(self.changed[key]).tobytes())
+        return digest.digest()
+    
+    def unpack(self) -> np.ndarray:
+        #boolean occupancy grid of the whole map indexed as [y,x], computing every tile
+        occupancy=np.empty(self.shape,dtype=np.bool_)
+        size=self.tileSize
+        for ty in range(0,(self.height-1)//size+1):
+            for tx in range(0,(self.width-1)//size+1):
+                key=(ty,tx)
+                tile=self.changed.get(key)
+                if tile is None:
+                    tile=self.tiles[key] if key in self.tiles else self.computeTile(ty,tx)
+                occupancy[ty*size:ty*size+tile.shape[0],tx*size:tx*size+tile.shape[1]]=tile
+        return occupancy
+
+
+#Class for a per cell array of a SparseSearchState, a dict holding only the cells written since the last reset
+#reading a cell that was not written gives the default without storing it, the lookup of a cell that was
+#written is a dict lookup, which costs about as much in the search loop as indexing an array
+class SparseCells(dict):
+    
+    __slots__=("default",)
+    
+    def __init__(self,default):
+        super().__init__()
+        self.default=default
+    
+    def __missing__(self,index: int):
+        return self.default
+    
+    def dense(self,size: int,dtype) -> np.ndarray:
+        #flat array of every cell with the default for the cells not written
+        cells=np.full(size,self.default,dtype=dtype)
+        if self:
+            cells[np.fromiter(self.keys(),dtype=np.int64,count=len(self))]=np.fromiter(self.values(),dtype=dtype,count=len(self))
+        return cells
+
+
+#Class for the closed flags of a SparseSearchState, the obstacle cells are closed as in SearchState
+#the obstacle flag of a cell is read from its tile the first time the cell is looked up after a reset
+#and kept until the next reset, the tiles read are held as flat views until then as well
+class SparseClosed(SparseCells):
+    
+    __slots__=("grid","tiles")
+    
+    def __init__(self,grid: TiledOccupancy):
+        super().__init__(0)
+        self.grid=grid
+        self.tiles=dict()
+    
+    def __missing__(self,index: int):
+        grid=self.grid
+        size=grid.tileSize
+        y,x=divmod(index,grid.width)
+        key=(y//size,x//size)
+        view=self.tiles.get(key)
+        if view is None:
+            tile=grid.tile(*key)
+            view=self.tiles[key]=(memoryview(tile.reshape(-1).view(np.uint8)),tile.shape[1])
+        cells,width=view
+        value=cells[(y%size)*width+x%size]
+        self[index]=value
+        return value
+    
+    def clear(self):
+        super().clear()
+        self.tiles.clear()
+
+
+#Class for the search state of a map too large for arrays of all its cells, the one of a TiledOccupancy
+#It is used like SearchState, but its per cell arrays are SparseCells holding only the cells the last search
+#touched, so the time to create it and the memory it takes grow with the area searched and not with the map
+class SparseSearchState(SearchState):
+    
+    __slots__=()
+    
+    #Constructor takes the tiled occupancy grid of the map, its tiles are only read where a search reaches them
+    def __init__(self,grid: TiledOccupancy):
+        self.height,self.width=grid.shape
+        self.cost=SparseCells(np.inf)
+        self.parent=SparseCells(-1)
+        self.closed=SparseClosed(grid)
+        
+        #flat indices of the closed cells by the number of the expansion that closed them
+        self.order=SparseCells(0)
+        self.expanded=0
+        self.heapPeak=0
+        self.heapOps=0
+        self.heapPushes=0
+        self.filled=list()
+        self.queryId=0
+    
+    #arrays of every cell shaped like the map, built from the cells touched, the other cells are not closed
+    def costGrid(self) -> np.ndarray:
+        return self.cost.dense(self.width*self.height,np.float32).reshape(self.height,self.width)
+    
+    def parentGrid(self) -> np.ndarray:
+        return self.parent.dense(self.width*self.height,np.int32).reshape(self.height,self.width)
+    
+    def closedGrid(self) -> np.ndarray:
+        return self.closed.dense(self.width*self.height,np.bool_).reshape(self.height,self.width)
+    
+    def closedOrder(self) -> np.ndarray:
+        return np.fromiter(self.order.values(),dtype=np.int32,count=len(self.order))
+    
+    def reset(self,heap: list):
+        #every cell touched by the last search is in the dicts, so clearing them resets it
+        for cells in (self.cost,self.parent,self.closed,self.order):
+            cells.clear()
+        heap.clear()
+        self.filled.clear()
+        self.queryId+=1
+        self.expanded=0
+        self.heapPeak=0
+        self.heapOps=0
+        self.heapPushes=0
+    
+    def divideCosts(self,heap: list,divisor: float):
+        #only the cells reached by the search have a cost
+        cost=self.cost
+        for index in cost:
+            cost[index]/=divisor
+    
+    def memoryUsage(self) -> int:
+        #bytes of the dicts, of the values stored in them and of the priority queue at its largest
+        tables=sum(sys.getsizeof(cells) for cells in (self.cost,self.parent,self.closed,self.order))
+        values=len(self.cost)*sys.getsizeof(0.0)+(len(self.parent)+len(self.order))*sys.getsizeof(self.width*self.height)
+        return tables+values+self.heapPeak*self.heapEntryBytes()
+
+
+#map the planner uses when no other map is given
+DEFAULT_MAP=os.path.join(os.path.dirname(os.path.abspath(__file__)),"maps","default.json")
+
+#directory of the compiled maps and other caches kept between runs
+CACHE_DIR=os.environ.get("PATHPLANNING_CACHE",os.path.join(os.path.expanduser("~"),".cache","pathplanning"))
+
+#colour of the border in the render layer
+BORDER_COLOR=(0,0,0)
+
+
+def readMapFile(path: str) -> dict:
+    """
+    This function reads a map description from a JSON file, or from a YAML file if PyYAML is installed.
+    A map has its "width" and "height" in cells, the "clearance" kept around every obstacle,
+    wether the "border" of the map is an obstacle and a list of "obstacles".
+    An obstacle is either {"type": "polygon", "points": [[x, y], ...]} (convex or concave)
+    or {"type": "circle", "center": [x, y], "radius": r}, with an optional BGR "color" for rendering.
+
+    Args:
+        path (str): path of the map file
+
+    Returns:
+        dict: the map description
+    """
+    with open(path) as file:
+        if path.endswith(".yaml") or path.endswith(".yml"):
+            import yaml
+            return yaml.safe_load(file)
+        return json.load(file)
+
+
+def scaleMap(spec: dict,resolution: float) -> dict:
+    """
+    This function scales a map description to a number of cells per unit of the map, a finer grid for
+    a resolution above 1. The size, clearance and the points, centres and radii of the obstacles are scaled,
+    so the obstacles cover the same area of the map at every resolution.
+
+    Args:
+        spec (dict): the map description (see readMapFile)
+        resolution (float): number of cells per unit of the map, 10 for a cell of 0.1 units
+
+    Raises:
+        ValueError: if the resolution is not positive
+
+    Returns:
+        dict: the map description in cells
+    """
+    if resolution<=0:
+        raise ValueError("The resolution has to be positive")
+    if resolution==1:
+        return spec
+    scaled=dict(spec,width=int(round(spec["width"]*resolution)),height=int(round(spec["height"]*resolution)),
+                clearance=spec.get("clearance",0)*resolution,obstacles=list())
+    for obstacle in spec.get("obstacles",[]):
+        obstacle=dict(obstacle)
+        if "points" in obstacle:
+            obstacle["points"]=[[x*resolution,y*resolution] for x,y in obstacle["points"]]
+        if "center" in obstacle:
+            obstacle["center"]=[value*resolution for value in obstacle["center"]]
+            obstacle["radius"]=obstacle["radius"]*resolution
+        scaled["obstacles"].append(obstacle)
+    return scaled
+
+
+def obstacleBounds(obstacle: dict,clearance: float = 0.0) -> tuple:
+    """
+    This function finds the bounding box of an obstacle grown by the clearance
+
+    Args:
+        obstacle (dict): the obstacle from the map description
+        clearance (float): distance kept around the obstacle
+
+    Raises:
+        ValueError: if the type of the obstacle is unknown
+
+    Returns:
+        tuple: xmin,ymin,xmax,ymax of the grown obstacle
+    """
+    if obstacle["type"]=="circle":
+        cx,cy=obstacle["center"]
+        reach=obstacle["radius"]+clearance
+        return cx-reach,cy-reach,cx+reach,cy+reach
+    if obstacle["type"]=="polygon":
+        points=np.asarray(obstacle["points"],dtype=np.float64)
+        xmin,ymin=points.min(axis=0)-clearance
+        xmax,ymax=points.max(axis=0)+clearance
+        return xmin,ymin,xmax,ymax
+    raise ValueError("Unknown obstacle type: %s"%obstacle["type"])
+
+
+def obstacleRegion(obstacle: dict,clearance: float,width: int,height: int,bounds: tuple = None):
+    """
+    This function finds the cells covered by an obstacle grown by the clearance.
+    Only the cells inside the bounding box of the grown obstacle are evaluated.
+
+    Args:
+        obstacle (dict): the obstacle from the map description
+        clearance (float): distance kept around the obstacle
+        width (int): number of cells along the x axis
+        height (int): number of cells along the y axis
+        bounds (tuple): xmin,ymin,xmax,ymax of the cells evaluated (the max excluded), the whole map if none is given
+
+    Returns:
+        tuple,np.ndarray: the (rows, columns) slices of the bounding box and the mask of the covered cells in it,
+                          None,None if the obstacle lies outside the map
+    """
+    xmin,ymin,xmax,ymax=obstacleBounds(obstacle,clearance)
+    if obstacle["type"]=="circle":
+        cx,cy=obstacle["center"]
+        reach=obstacle["radius"]+clearance
+    else:
+        points=np.asarray(obstacle["points"],dtype=np.float64)
+    
+    left,top,right,bottom=(0,0,width,height) if bounds is None else bounds
+    columns=slice(max(int(np.floor(xmin)),left),min(int(np.ceil(xmax))+1,right))
+    rows=slice(max(int(np.floor(ymin)),top),min(int(np.ceil(ymax))+1,bottom))
+    if columns.start>=columns.stop or rows.start>=rows.stop:
+        return None,None
+    x,y=np.meshgrid(np.arange(columns.start,columns.stop,dtype=np.float64),np.arange(rows.start,rows.stop,dtype=np.float64))
+    
+    if obstacle["type"]=="circle":
+        return (rows,columns),(x-cx)**2+(y-cy)**2<=reach**2
+    
+    #a cell is covered if it is inside the polygon (even-odd rule, so concave polygons work)
+    #or closer than the clearance to one of its edges
+    inside=np.zeros(x.shape,dtype=np.bool_)
+    near=np.zeros(x.shape,dtype=np.bool_)
+    for (x0,y0),(x1,y1) in zip(points,np.roll(points,-1,axis=0)):
+        if y0!=y1:
+            inside^=((y0>y)!=(y1>y))&(x<(x1-x0)*(y-y0)/(y1-y0)+x0)
+        dx,dy=x1-x0,y1-y0
+        t=np.clip(((x-x0)*dx+(y-y0)*dy)/max(dx*dx+dy*dy,1e-12),0,1)
+        near|=(x-x0-t*dx)**2+(y-y0-t*dy)**2<=clearance**2
+    return (rows,columns),inside|near
+
+
+def distanceTransform(obstacles: np.ndarray) -> np.ndarray:
+    """
+    This function finds the exact Euclidean distance from every cell to the nearest obstacle cell.
+    SciPy is used if it is installed, otherwise the distances are found with NumPy in two passes,
+    along the columns and then along the rows (see rowDistance), both linear in the number of cells.
+
+    Args:
+        obstacles (np.ndarray): boolean grid indexed as [y,x], true for the obstacle cells
+
+    Returns:
+        np.ndarray: float32 distance in cells between the centres, 0 for obstacle cells and inf if there are none
+    """
+    if not obstacles.any():
+        return np.full(obstacles.shape,np.inf,dtype=np.float32)
+    try:
+        from scipy.ndimage import distance_transform_edt
+        return distance_transform_edt(~obstacles).astype(np.float32)
+    except ImportError:
+        pass
+    
+    #distance along the column to the nearest obstacle cell above or below, from the rows of the last one seen
+    height,width=obstacles.shape
+    rows=np.arange(height,dtype=np.float64)[:,None]
+    above=np.maximum.accumulate(np.where(obstacles,rows,-np.inf),axis=0)
+    below=np.minimum.accumulate(np.where(obstacles,rows,np.inf)[::-1],axis=0)[::-1]
+    columnDistance=np.minimum(rows-above,below-rows)**2
+    return np.sqrt(rowDistance(columnDistance)).astype(np.float32)
+
+
+def rowDistance(columnDistance: np.ndarray) -> np.ndarray:
+    """
+    This function finds for every cell (x,y) the smallest (x-q)**2+columnDistance[y,q] over the cells q of its row.
+    Each cell q is a parabola rooted at q, the lower envelope of the parabolas of a row is built in one pass
+    and read in another (Felzenszwalb and Huttenlocher), so the time is linear in the number of cells.
+    The rows are processed together, one column at a time.
+
+    Args:
+        columnDistance (np.ndarray): squared distance along the column to the nearest obstacle cell,
+                                     inf for every cell of a column without obstacles
+
+    Returns:
+        np.ndarray: float64 squared distance to the nearest obstacle cell
+    """
+    height,width=columnDistance.shape
+    everyRow=np.arange(height)
+    
+    #roots of the parabolas on the envelope of every row, the left end of the part of the row each one is
+    #the lowest on, and the index of the last parabola on the envelope
+    roots=np.zeros((height,width),dtype=np.int64)
+    ends=np.empty((height,width+1))
+    last=np.full(height,-1,dtype=np.int64)
+    for q in range(width):
+        #a column without obstacles is inf in every row and adds no parabola
+        f=columnDistance[:,q]
+        if f[0]==np.inf:
+            continue
+        if last[0]<0:
+            last[:]=0
+            roots[:,0]=q
+            ends[:,0]=-np.inf
+            ends[:,1]=np.inf
+            continue
+        
+        #the parabolas of the envelope that are above the new one where it starts are dropped
+        crossing=np.empty(height)
+        pending=everyRow
+        while pending.size:
+            k=last[pending]
+            root=roots[pending,k]
+            at=((f[pending]+q*q)-(columnDistance[pending,root]+root*root))/(2*(q-root))
+            crossing[pending]=at
+            dropped=at<=ends[pending,k]
+            pending=pending[dropped]
+            last[pending]-=1
+        last+=1
+        roots[everyRow,last]=q
+        ends[everyRow,last]=crossing
+        ends[everyRow,last+1]=np.inf
+    
+    squared=np.empty((height,width))
+    x=np.arange(width)
+    for y in range(height):
+        #the parabola lowest at x is the last one whose part of the row starts before x
+        root=roots[y,np.searchsorted(ends[y,1:last[y]+1],x)]
+        squared[y]=(x-root)**2+columnDistance[y,root]
+    return squared
+
+
+def mapField(spec: dict = None):
+    """
+    This function rasterizes the obstacles of a map description without any clearance and finds the distance
+    from every cell to them. Growing the obstacles by the clearance and the radius of the robot is then
+    a threshold on the distance (see inflate), so the field is computed once for every robot size.
+    The border is placed at x=0, x=width, y=0 and y=height, so a cell at most the clearance away from it
+    is in obstacle space.
+
+    Args:
+        spec (dict): the map description (see readMapFile), the default map if none is given
+
+    Returns:
+        np.ndarray,np.ndarray,float: (height,width) float32 distance to the nearest obstacle indexed as [y,x],
+                                     (height,width,3) uint8 BGR colour of every cell indexed the same way
+                                     and the clearance of the map
+    """
+    if spec is None:
+        spec=readMapFile(DEFAULT_MAP)
+    width,height=int(spec["width"]),int(spec["height"])
+    clearance=spec.get("clearance",0)
+    
+    #the raw obstacles have one more row and column than the map for the border at x=width and y=height
+    raw=np.zeros((height+1,width+1),dtype=np.bool_)
+    layer=np.full((height,width,3),255,dtype=np.uint8)
+    
+    if spec.get("border",True):
+        raw[[0,-1],:]=True
+        raw[:,[0,-1]]=True
+        x=np.arange(width)
+        y=np.arange(height)
+        border=((x<=clearance)|(x>=width-clearance))[None,:]|((y<=clearance)|(y>=height-clearance))[:,None]
+        layer[border]=BORDER_COLOR
+    
+    for obstacle in spec.get("obstacles",[]):
+        window,covered=obstacleRegion(obstacle,0,width,height)
+        if window is not None:
+            raw[window]|=covered
+        
+        #the render layer shows the obstacles grown by the clearance
+        window,covered=obstacleRegion(obstacle,clearance,width,height)
+        if window is not None:
+            layer[window][covered]=obstacle.get("color",BORDER_COLOR)
+    
+    return distanceTransform(raw)[:height,:width],layer,float(clearance)
+
+
+def inflate(distance: np.ndarray,reach: float) -> np.ndarray:
+    """
+    This function turns the distance field of a map into the occupancy grid used by the search
+
+    Args:
+        distance (np.ndarray): distance to the nearest obstacle of every cell (see mapField)
+        reach (float): radius of the robot plus the clearance, the cells at most this far from an obstacle
+                       are in obstacle space
+
+    Returns:
+        np.ndarray: (height,width) boolean occupancy grid indexed as [y,x], true where the cell is in obstacle space
+    """
+    occupancy=distance<=reach
+    
+    #the cells on the edge of the grid are always obstacles so the neighbours of a free cell never fall outside of it
+    occupancy[[0,-1],:]=True
+    occupancy[:,[0,-1]]=True
+    return occupancy
+
+
+def compileMap(spec: dict = None,radius: float = 0.0,clearance: float = None,resolution: float = 1.0):
+    """
+    This function compiles a map description into the occupancy grid used by the search
+    and the render layer used by the visualization, so the obstacles are only described once.
+
+    Args:
+        spec (dict): the map description (see readMapFile), the default map if none is given
+        radius (float): radius of the robot, 0 for the point robot
+        clearance (float): clearance kept around the obstacles, the one of the map if none is given
+        resolution (float): number of cells per unit of the map (see scaleMap), the radius and clearance
+                            are in units of the map
+
+    Returns:
+        np.ndarray,np.ndarray: (height,width) boolean occupancy grid indexed as [y,x], true where the cell is in
+                               obstacle space, and (height,width,3) uint8 BGR colour of every cell indexed the same way
+    """
+    if spec is None:
+        spec=readMapFile(DEFAULT_MAP)
+    distance,layer,mapClearance=mapField(scaleMap(spec,resolution))
+    return inflate(distance,radius*resolution+(mapClearance if clearance is None else clearance*resolution)),layer
+
+
+def loadMap(path: str = None,cacheDir: str = CACHE_DIR,radius: float = 0.0,clearance: float = None,
+            resolution: float = 1.0,packed: bool = False):
+    """
+    This function compiles a map file, or loads it from the cache if the same file was compiled before.
+    The distance field of the map (see mapField) is cached under the hash of the content of the file
+    and the resolution, so a robot of any size only needs the threshold of inflate.
+
+    Args:
+        path (str): path of the map file, the default map if none is given
+        cacheDir (str): directory of the compiled maps, None for not caching
+        radius (float): radius of the robot, 0 for the point robot
+        clearance (float): clearance kept around the obstacles, the one of the map if none is given
+        resolution (float): number of cells per unit of the map (see scaleMap)
+        packed (bool): return the occupancy grid as a PackedGrid, 8 cells per byte
+
+    Returns:
+        np.ndarray,np.ndarray: the occupancy grid and the render layer (see compileMap)
+    """
+    if path is None:
+        path=DEFAULT_MAP
+    with open(path,"rb") as file:
+        content=file.read()
+    if cacheDir is None:
+        occupancy,layer=compileMap(readMapFile(path),radius,clearance,resolution)
+        return (PackedGrid(occupancy) if packed else occupancy),layer
+    
+    name=hashlib.sha1(content).hexdigest()[:16]+("" if resolution==1 else "_%g"%resolution)
+    cached=os.path.join(cacheDir,"field_%s.npz"%name)
+    if os.path.exists(cached):
+        with np.load(cached) as data:
+            distance,layer,mapClearance=data["distance"],data["layer"],float(data["clearance"])
+    else:
+        distance,layer,mapClearance=mapField(scaleMap(readMapFile(path),resolution))
+        os.makedirs(cacheDir,exist_ok=True)
+        with open(cached+".tmp","wb") as file:
+            np.savez(file,distance=distance,layer=layer,clearance=mapClearance)
+        os.replace(cached+".tmp",cached)
+    occupancy=inflate(distance,radius*resolution+(mapClearance if clearance is None else clearance*resolution))
+    return (PackedGrid(occupancy) if packed else occupancy),layer
+
+
+def occupancyHash(occupancy: np.ndarray) -> str:
+    """
+    This function hashes an occupancy grid, the hash names the files cached for the map
+
+    Args:
+        occupancy (np.ndarray): occupancy grid of the map, or the PackedGrid or TiledOccupancy of it,
+                                the tiles are hashed by the map description they are computed from
+
+    Returns:
+        str: 16 hexadecimal digits of the SHA-1 of the shape and the cells of the grid
+    """
+    digest=hashlib.sha1(repr(tuple(occupancy.shape)).encode())
+    if isinstance(occupancy,TiledOccupancy):
+        digest.update(occupancy.digest())
+    else:
+        digest.update(occupancy.bits.tobytes() if isinstance(occupancy,PackedGrid) else np.packbits(occupancy).tobytes())
+    return digest.hexdigest()[:16]
+
+
+#action set of the point robot as (dx, dy, cost)
+#in the order UP, UPRIGHT, RIGHT, DOWNRIGHT, DOWN, DOWNLEFT, LEFT, UPLEFT
+ACTIONS=[(0,1,1),(1,1,1.4),(1,0,1),(1,-1,1.4),(0,-1,1),(-1,-1,1.4),(-1,0,1),(-1,1,1.4)]
+
+#search algorithms that can be selected for a query
+SEARCH_MODES=("dijkstra","astar","bidirectional","jps")
+
+#priority queues the dijkstra search can use, the binary heap of heapq or the buckets of Dials Algorithm
+QUEUES=("heap","bucket")
+
+#scale turning the costs of the actions into the integers 10 and 14 for the searches on integer costs
+COST_SCALE=10
+
+#engines computing the full cost field from a point, the dijkstra search or the vectorized wavefront
+FIELD_ENGINES=("search","wavefront")
+
+#layout of the search trace files, see TraceWriter
+TRACE_MAGIC=b"DJTR"
+TRACE_HEADER=struct.Struct("<4sIII")
+TRACE_STRUCT=struct.Struct("<iifI")
+TRACE_RECORD=np.dtype([("index","<i4"),("parent","<i4"),("cost","<f4"),("order","<u4")])
+TRACE_BACKWARD=1<<31
+
+
+#Class for planning paths on one map
+#The compiled map and the search state are kept between queries so plan can be called any number of times
+class Planner:
+    
+    #Constructor takes the occupancy grid of the map, the default map is loaded if none is given
+    #the border cells of the grid must be obstacles so the neighbours of a free cell never fall outside of it
+    #the grid is used without copying, so it can live in shared memory, and it can be a PackedGrid or TiledOccupancy
+    #resolution is the number of cells per unit of the map (see compileMap), the costs are in units of the map
+    def __init__(self,occupancy: np.ndarray = None,resolution: float = 1.0):
+        if occupancy is None:
+            occupancy,_=loadMap()
+        self.height,self.width=occupancy.shape
+        self.resolution=resolution
+        
+        #flat view of the occupancy grid, indexing a memoryview is the cheapest lookup in the search loop
+        #only the jump point search scans it, the other searches find the obstacles in the closed flags
+        if isinstance(occupancy,(PackedGrid,TiledOccupancy)):
+            self.obstacleMap=occupancy
+            self.obstacleCells=occupancy
+        else:
+            self.obstacleMap=np.ascontiguousarray(occupancy,dtype=np.bool_)
+            self.obstacleCells=memoryview(self.obstacleMap.reshape(-1).view(np.uint8))
+        
+        #the actions as offsets between flat indices, with their cost and with the cost scaled to an integer
+        #both in cells, the cost of a query is turned into units of the map once it is found
+        self.moves=[(dy*self.width+dx,step) for dx,dy,step in ACTIONS]
+        self.integerMoves=[(dy*self.width+dx,int(round(step*COST_SCALE))) for dx,dy,step in ACTIONS]
+        
+        #search state and priority queue, reused by every query
+        #the entries of q are (COC, flat index of the cell) tuples
+        self.state=self.newState()
+        self.q=list()
+        
+        #search state and priority queue of the backward search of the bidirectional mode, allocated on first use
+        self.reverseState=None
+        self.reverseQ=list()
+        
+        #number of nodes expanded by the last query and of pushes and pops on its priority queues
+        self.expanded=0
+        self.heapOps=0
+        
+        #mode and wall time of the search and the backtracking of the last query, see queryStats
+        self.mode=None
+        self.timers=dict()
+        
+        #counting of the obstacle tests and closed set lookups of the searches,
+        #off by default as it makes every lookup a method call
+        self.countLookups=False
+        self.lookupViews=list()
+        
+        #version of the map, raised by updateMap, and the hash of the map at the version it was computed for
+        self.mapVersion=0
+        self.hashedVersion=-1
+        self.hashValue=None
+    
+    #checks wether the point lies in obstacle space or outside the map
+    def isObstacle(self,x: int,y: int) -> bool:
+        if not (0<=x<self.width and 0<=y<self.height):
+            return True
+        return bool(self.obstacleCells[y*self.width+x])
+    
+    def occupancy(self) -> np.ndarray:
+        #boolean occupancy grid indexed as [y,x], unpacked if the map is stored packed or in tiles
+        if isinstance(self.obstacleMap,(PackedGrid,TiledOccupancy)):
+            return self.obstacleMap.unpack()
+        return self.obstacleMap
+    
+    def newState(self) -> SearchState:
+        #search state with the obstacle cells closed, on a tiled map a sparse one holding only the cells searched
+        #and on a bit-packed map one with a closed flag of one bit per cell, so the grid is never unpacked
+        if isinstance(self.obstacleMap,TiledOccupancy):
+            return SparseSearchState(self.obstacleMap)
+        return SearchState(self.width,self.height,self.obstacleMap)
+    
+    def memoryUsage(self) -> dict:
+        #bytes used by the occupancy grid and by the search state of the last query at its largest
+        search=self.state.memoryUsage()
+        if self.mode=="bidirectional":
+            search+=self.reverseState.memoryUsage()
+        return {"occupancy":self.obstacleMap.nbytes,"search":search}
+    
+    def plan(self,start,goal,mode: str = "dijkstra",trace=None,queue: str = "heap"):
+        """
+        This function finds the optimal path between intial and goal point.
+        The number of nodes expanded by the search is left in expanded and the number of heap operations in heapOps.
+
+        Args:
+            start (tuple): (x,y) coordinate of the intial point
+            goal (tuple): (x,y) coordinate of the goal point
+            mode (str): search algorithm, one of SEARCH_MODES
+            trace (TraceWriter): trace the expansions of the search are written to
+            queue (str): priority queue of the search, one of QUEUES, the bucket queue only for the dijkstra mode
+
+        Raises:
+            ValueError: if the intial or goal point lies in obstacle space, the mode or queue is unknown
+                        or the mode can not use the queue
+
+        Returns:
+            float,list: cost of the optimal path in units of the map and the (x,y) coordinates of the cells on it
+                        from start to goal, None,[] if there is no path between the points
+        """
+        if self.isObstacle(*start):
+            raise ValueError("Intial point in obstacle space")
+        if self.isObstacle(*goal):
+            raise ValueError("Goal point in obstacle space")
+        if queue not in QUEUES:
+            raise ValueError("Unknown queue: %s"%queue)
+        if queue=="bucket" and mode!="dijkstra":
+            raise ValueError("The bucket queue can only be used by the dijkstra mode")
+        
+        initIndex=start[1]*self.width+start[0]
+        goalIndex=goal[1]*self.width+goal[0]
+        self.mode=mode
+        self.lookupViews=list()
+        begin=time.perf_counter()
+        if mode=="bidirectional":
+            #the path is joined inside the search, so the backtracking is timed with it
+            coc,path=self.searchBidirectional(initIndex,goalIndex,trace)
+            searched=time.perf_counter()
+            self.expanded=self.state.expanded+self.reverseState.expanded
+            self.heapOps=self.state.heapOps+self.reverseState.heapOps
+        else:
+            if mode=="dijkstra" and queue=="bucket":
+                coc=self.searchDial(initIndex,goalIndex,trace)
+            elif mode=="dijkstra":
+                coc=self.search(initIndex,goalIndex,trace)
+            elif mode=="astar":
+                coc=self.searchAStar(initIndex,goalIndex,trace)
+            elif mode=="jps":
+                coc=self.searchJPS(initIndex,goalIndex,trace)
+            else:
+                raise ValueError("Unknown search mode: %s"%mode)
+            searched=time.perf_counter()
+            path=BackTrack(self.state,goalIndex) if coc is not None else []
+            self.expanded=self.state.expanded
+            self.heapOps=self.state.heapOps
+        self.timers={"search":searched-begin,"backtrack":time.perf_counter()-searched}
+        if coc is None:
+            return None,[]
+        return coc/self.resolution,[(i%self.width,i//self.width) for i in path]
+    
+    def costField(self,goal,engine: str = "search"):
+        """
+        This function runs the Dijkstras Algorithm from the goal point until every reachable cell is closed.
+        As the actions are symmetric the cost of a cell is the cost of the optimal path from it to the goal,
+        and following the parents from any cell leads to the goal along that path.
+        The number of nodes expanded is left in expanded and the number of heap operations in heapOps as by plan.
+
+        Args:
+            goal (tuple): (x,y) coordinate of the goal point
+            engine (str): one of FIELD_ENGINES, search closes one cell at a time and wavefront closes all the cells
+                          with the same cost at once with NumPy (see wavefront), which is faster on large maps
+
+        Raises:
+            ValueError: if the goal point lies in obstacle space or the engine is unknown
+
+        Returns:
+            np.ndarray,np.ndarray: (height,width) float32 cost in units of the map and int32 parent arrays,
+                                   inf and -1 for unreachable cells
+        """
+        if self.isObstacle(*goal):
+            raise ValueError("Goal point in obstacle space")
+        if engine not in FIELD_ENGINES:
+            raise ValueError("Unknown field engine: %s"%engine)
+        self.mode="dijkstra"
+        self.lookupViews=list()
+        begin=time.perf_counter()
+        if engine=="wavefront":
+            state=self.wavefront(goal[1]*self.width+goal[0])
+        else:
+            self.search(goal[1]*self.width+goal[0],-1)
+            state=self.state
+        self.timers={"search":time.perf_counter()-begin,"backtrack":0.0}
+        self.expanded=state.expanded
+        self.heapOps=state.heapOps
+        return state.costGrid()/np.float32(self.resolution),state.parentGrid().copy()
+    
+    def planMany(self,start,goals,nearest: int = None,maxCost: float = None):
+        """
+        This function finds the optimal paths from the intial point to a set of goal points with one search.
+        The Dijkstras Algorithm is run from the intial point until every goal is closed, or the nearest ones are,
+        and the goals are returned lazily in the order they are closed, which is the order of their cost.
+        The path of a goal is only backtracked when it is returned. The search state is kept while the goals are
+        read, so the planner must not be used for another query before the last one is read.
+
+        Args:
+            start (tuple): (x,y) coordinate of the intial point
+            goals: (x,y) coordinates of the goal points, a goal given twice is returned once
+            nearest (int): stop once this many goals are closed, None for all of them
+            maxCost (float): stop once the cheapest open cell costs more, so the search does not close every
+                             reachable cell of the map when some goals can not be reached, None for no bound
+
+        Raises:
+            ValueError: if the intial or a goal point lies in obstacle space
+
+        Returns:
+            generator: (goal, cost, path) for every goal closed, as returned by plan, and (goal, None, []) for the
+                       goals that can not be reached or cost more than maxCost unless the search stopped at nearest.
+                       It raises RuntimeError if the planner was used for another query in between
+        """
+        if self.isObstacle(*start):
+            raise ValueError("Intial point in obstacle space")
+        targets=dict()
+        for goal in goals:
+            if self.isObstacle(*goal):
+                raise ValueError("Goal point %s in obstacle space"%(tuple(goal),))
+            targets[goal[1]*self.width+goal[0]]=tuple(goal)
+        self.mode="dijkstra"
+        self.lookupViews=list()
+        return self.searchMany(start[1]*self.width+start[0],targets,nearest,maxCost)
+    
+    def lookupView(self,cells,name: str):
+        #the cells as read by a search, wrapped for counting the reads when countLookups is set
+        if not self.countLookups:
+            return cells
+        view=CountedCells(cells,name)
+        self.lookupViews.append(view)
+        return view
+    
+    def queryStats(self) -> dict:
+        """
+        This function collects the counters and timers of the last query.
+        A pop of a cell that was already closed is stale, and a push of a cell that was already on the heap
+        with a higher COC is a decrease-key. Every cell pushed is either closed or still on the heap,
+        so these are found from the heap left by the search without counting them in the search loop.
+
+        Returns:
+            dict: mode, nodes expanded, heap pushes, pops, stale pops and decrease-keys, obstacle tests and closed
+                  set lookups (None unless countLookups was set) and the search and backtrack time in seconds
+        """
+        sides=[(self.state,self.q)]
+        if self.mode=="bidirectional":
+            sides.append((self.reverseState,self.reverseQ))
+        expanded=pushes=pops=reached=0
+        for state,q in sides:
+            expanded+=state.expanded
+            pushes+=state.heapPushes
+            pops+=state.heapOps-state.heapPushes
+            reached+=state.expanded+len({entry[-1] for entry in q if not state.closed[entry[-1]]})
+        
+        lookups={"obstacleTests":None,"closedLookups":None}
+        if self.countLookups:
+            lookups={name:sum(view.count for view in self.lookupViews if view.name==name) for name in lookups}
+        stats={"mode":self.mode,"expanded":expanded,"heapPushes":pushes,"heapPops":pops,"stalePops":pops-expanded,
+               "decreaseKeys":pushes-reached}
+        stats.update(lookups)
+        stats.update(searchSeconds=self.timers.get("search"),backtrackSeconds=self.timers.get("backtrack"))
+        return stats
+    
+    def updateMap(self,blocked=(),freed=()):
+        """
+        This function changes the obstacles of the map. The changes have to go through here and not through
+        obstacleMap, as the version of the map is raised so the hash and everything cached under it is renewed.
+
+        Args:
+            blocked: (x,y) coordinates of the cells that became obstacles
+            freed: (x,y) coordinates of the cells that became free
+
+        Raises:
+            ValueError: if a cell is outside of the map or on its border, which always stays an obstacle
+        """
+        #the search states are reset first, so the cells of the last search are not reopened over the new obstacles
+        states=[(self.state,self.q)]+([(self.reverseState,self.reverseQ)] if self.reverseState is not None else [])
+        for state,q in states:
+            state.reset(q)
+        for cells,value in ((blocked,1),(freed,0)):
+            for x,y in cells:
+                if not (0<x<self.width-1 and 0<y<self.height-1):
+                    raise ValueError("Cell (%d, %d) is not inside the border of the map"%(x,y))
+                index=y*self.width+x
+                self.obstacleCells[index]=value
+                for state,_ in states:
+                    state.closed[index]=value
+        self.mapVersion+=1
+    
+    @property
+    def mapHash(self) -> str:
+        #hash of the occupancy grid, used for naming the cached files and results of this map
+        #it is only computed again after the map changed
+        if self.hashedVersion!=self.mapVersion:
+            self.hashValue=occupancyHash(self.obstacleMap)
+            self.hashedVersion=self.mapVersion
+        return self.hashValue
+    
+    def search(self,initIndex: int,goalIndex: int,trace=None):
+        """
+        This function runs the Dijkstras Algorithm on the flat indexes of the cells.
+        The search state is reset first and holds the result of the search afterwards.
+
+        Args:
+            initIndex (int): flat index of the intial cell
+            goalIndex (int): flat index of the goal cell, -1 for closing every reachable cell
+            trace (TraceWriter): trace the expansions are written to
+
+        Returns:
+            float: cost of the optimal path to the goal cell, None if it was not reached
+        """
+        state=self.state
+        q=self.q
+        state.reset(q)
+        
+        cost=state.cost
+        parent=state.parent
+        closed=self.lookupView(state.closed,"closedLookups")
+        order=state.order
+        
+        #Intitailzing the intial cell
+        cost[initIndex]=0
+        parent[initIndex]=-1
+    
+        #pushing the intial cell onto the heap
+        #every entry pushed is popped once unless it is still on the heap when the search stops
+        heappush(q,(0.0,initIndex))
+        expanded=0
+        heapPeak=1
+        pushes=1
+        
+        #Iterating through the heap while it is not empty
+        while q:
+            
+            #removing the cell from the heap and closing it
+            #a cell whose COC was lowered is pushed again instead of being updated inside the heap
+            #the older entries for it are stale and are skipped once the cell has been closed
+            coc,index=heappop(q)
+            if closed[index]:
+                continue
+            closed[index]=1
+            order[expanded]=index
+            if trace is not None:
+                trace.record(index,parent[index],coc,expanded)
+            expanded+=1
+            
+            #If the poped cell is the goal cell we have found the optimal path
+            if index==goalIndex:
+                state.expanded=expanded
+                state.heapPeak=heapPeak
+                state.heapOps=2*pushes-len(q)
+                state.heapPushes=pushes
+                return coc
+            
+            #If the poped cell is not the goal cell we explore all its children by applying the action set on it.
+            #If the child is in obsatcle space or already closed we skip to the next action, both are closed flags.
+            #If the new COC is less than the COC of the child we update its COC and parent and push it on the heap.
+            for offset,step in self.moves:
+                child=index+offset
+                if not closed[child]:
+                    newcoc=coc+step
+                    if newcoc<cost[child]:
+                        cost[child]=newcoc
+                        parent[child]=index
+                        heappush(q,(newcoc,child))
+                        pushes+=1
+            if len(q)>heapPeak:
+                heapPeak=len(q)
+        
+        state.expanded=expanded
+        state.heapPeak=heapPeak
+        state.heapOps=2*pushes
+        state.heapPushes=pushes
+        return None
+
+    
+    def searchMany(self,initIndex: int,targets: dict,nearest: int = None,maxCost: float = None):
+        """
+        This is the Dijkstras Algorithm of search, run until all the target cells are closed (see planMany).
+        It is a generator, the search is paused while a target is returned and goes on when the next one is asked for.
+
+        Args:
+            initIndex (int): flat index of the intial cell
+            targets (dict): flat index of every goal cell to its (x,y) coordinate
+            nearest (int): number of targets after which the search stops, None for all of them
+            maxCost (float): COC in units of the map at which the search stops, None for no bound
+
+        Yields:
+            tuple,float,list: coordinate of the goal, cost of the optimal path to it and the (x,y) coordinates on it
+        """
+        state=self.state
+        q=self.q
+        state.reset(q)
+        queryId=state.queryId
+        
+        cost=state.cost
+        parent=state.parent
+        closed=self.lookupView(state.closed,"closedLookups")
+        order=state.order
+        width=self.width
+        remaining=dict(targets)
+        bound=np.inf if maxCost is None else maxCost*self.resolution
+        
+        cost[initIndex]=0
+        parent[initIndex]=-1
+        heappush(q,(0.0,initIndex))
+        expanded=0
+        heapPeak=1
+        pushes=1
+        found=0
+        
+        #the cheapest entry is only popped within the bound, so every cell reached is either closed or on the heap
+        while q and remaining and q[0][0]<=bound:
+            coc,index=heappop(q)
+            if closed[index]:
+                continue
+            closed[index]=1
+            order[expanded]=index
+            expanded+=1
+            
+            if index in remaining:
+                #the counters are stored before pausing, the next reset clears the cells touched so far with them
+                state.expanded=expanded
+                state.heapPeak=heapPeak
+                state.heapOps=2*pushes-len(q)
+                state.heapPushes=pushes
+                self.expanded=expanded
+                self.heapOps=state.heapOps
+                yield remaining.pop(index),coc/self.resolution,[(i%width,i//width) for i in BackTrack(state,index)]
+                if state.queryId!=queryId:
+                    raise RuntimeError("The planner was used for another query while the goals were read")
+                found+=1
+                if found==nearest:
+                    return
+            
+            for offset,step in self.moves:
+                child=index+offset
+                if not closed[child]:
+                    newcoc=coc+step
+                    if newcoc<cost[child]:
+                        cost[child]=newcoc
+                        parent[child]=index
+                        heappush(q,(newcoc,child))
+                        pushes+=1
+            if len(q)>heapPeak:
+                heapPeak=len(q)
+        
+        state.expanded=expanded
+        state.heapPeak=heapPeak
+        state.heapOps=2*pushes-len(q)
+        state.heapPushes=pushes
+        self.expanded=expanded
+        self.heapOps=state.heapOps
+        for point in remaining.values():
+            yield point,None,[]
+    
+    def searchDial(self,initIndex: int,goalIndex: int,trace=None):
+        """
+        This is the Dijkstras Algorithm with the bucket queue of Dials Algorithm instead of the heap.
+        The costs of the actions are scaled to the integers 10 and 14, so every COC is an integer and the cells
+        with the same COC are kept in one bucket. As no action costs more than 14 the open cells are never more
+        than 14 apart, and a circular array of 15 buckets indexed by COC modulo 15 holds all of them.
+        A push appends to a bucket and a pop takes from the bucket of the current COC, which is moved forward
+        over the empty buckets, so both take constant time and the COC are compared exactly.
+        The COC are kept scaled in the cost array during the search (float32 holds these integers exactly)
+        and turned back into the original units once it is over.
+
+        Args:
+            initIndex (int): flat index of the intial cell
+            goalIndex (int): flat index of the goal cell, -1 for closing every reachable cell
+            trace (TraceWriter): trace the expansions are written to
+
+        Returns:
+            float: cost of the optimal path to the goal cell in the original units, None if it was not reached
+        """
+        state=self.state
+        q=self.q
+        state.reset(q)
+        
+        cost=state.cost
+        parent=state.parent
+        closed=self.lookupView(state.closed,"closedLookups")
+        order=state.order
+        
+        size=max(step for _,step in self.integerMoves)+1
+        buckets=[list() for _ in range(size)]
+        cost[initIndex]=0
+        parent[initIndex]=-1
+        buckets[0].append(initIndex)
+        
+        #number of entries in the buckets, stale ones included
+        pending=1
+        expanded=0
+        heapPeak=1
+        pushes=1
+        current=0
+        found=None
+        
+        while pending and found is None:
+            bucket=buckets[current%size]
+            while bucket:
+                index=bucket.pop()
+                pending-=1
+                
+                #an entry of a cell whose COC was lowered later is stale, the cell was closed from a lower bucket
+                if closed[index]:
+                    continue
+                closed[index]=1
+                order[expanded]=index
+                if trace is not None:
+                    trace.record(index,parent[index],current/COST_SCALE,expanded)
+                expanded+=1
+                
+                if index==goalIndex:
+                    found=current
+                    break
+                
+                for offset,step in self.integerMoves:
+                    child=index+offset
+                    if not closed[child]:
+                        newcoc=current+step
+                        if newcoc<cost[child]:
+                            cost[child]=newcoc
+                            parent[child]=index
+                            buckets[newcoc%size].append(child)
+                            pending+=1
+                            pushes+=1
+                if pending>heapPeak:
+                    heapPeak=pending
+            current+=1
+        
+        #the entries left in the buckets are kept in the queue so the next reset clears their cells,
+        #and the cost of every cell reached is scaled back to the original units
+        q.extend((0,index) for bucket in buckets for index in bucket)
+        state.expanded=expanded
+        state.heapPeak=heapPeak
+        state.heapOps=2*pushes-pending
+        state.heapPushes=pushes
+        state.divideCosts(q,COST_SCALE)
+        return None if found is None else found/COST_SCALE
+    
+    def wavefront(self,initIndex: int):
+        """
+        This function computes the full cost field from a cell with NumPy, advancing the whole frontier at once.
+        The costs of the actions are scaled to the integers 10 and 14 as for the bucket queue (see searchDial),
+        and every step closes all the open cells with the lowest COC together, as none of them can be reached
+        cheaper through another open cell. The eight actions are then applied to the flat indexes of the whole
+        frontier as shifted arrays, and the children whose COC is lowered are put in the bucket of their new COC.
+        The COC are the ones of the bucket queue and a parent is always on an optimal path, the parent of a cell
+        with several optimal paths may differ from the one chosen by the search.
+        The search state holds the field afterwards as after search with goalIndex -1.
+        On a tiled map the field covers the whole map anyway, so its arrays are allocated for it alone
+        and the sparse search state of the planner is left empty. On a bit-packed map the closed flags are
+        unpacked into a search state of its own in the same way, as they are tested as bytes for the whole frontier.
+
+        Args:
+            initIndex (int): flat index of the intial cell
+
+        Returns:
+            SearchState: the search state holding the field
+        """
+        state=self.state
+        state.reset(self.q)
+        tiles=None
+        if isinstance(state,SparseSearchState):
+            #the closed flags start as UNKNOWN_CELL, neither closed nor open,
+            #and the tile of a cell is marked in them before its flag is tested
+            tiles=self.obstacleMap
+            state=SearchState(self.width,self.height)
+            state.closed=bytearray([UNKNOWN_CELL])*(self.width*self.height)
+            tiles.mark(state.closed,[initIndex])
+        elif isinstance(state.closed,PackedGrid):
+            state=SearchState(self.width,self.height,state.closed.unpack())
+        
+        #the closed flags are read as bytes, as a cell of a tile not marked yet is neither 0 nor 1
+        cost=np.frombuffer(state.cost,dtype=np.float32)
+        parent=np.frombuffer(state.parent,dtype=np.int32)
+        closed=np.frombuffer(state.closed,dtype=np.uint8)
+        order=np.frombuffer(state.order,dtype=np.int32)
+        
+        #scaled COC of every cell, kept as integers so the frontier of a bucket is found exactly
+        labels=np.full(len(cost),np.iinfo(np.int32).max,dtype=np.int32)
+        labels[initIndex]=0
+        parent[initIndex]=-1
+        
+        #the actions with the same cost are applied together, as an array of their offsets
+        steps=sorted({step for _,step in self.integerMoves})
+        groups=[(np.array([offset for offset,cost in self.integerMoves if cost==step]),step) for step in steps]
+        
+        #circular array of buckets of flat index arrays, as no action costs more than 14 the open COC fit in 15 of them
+        #all the scaled costs are multiples of their greatest common divisor, so only those buckets are visited
+        size=max(steps)+1
+        stride=int(np.gcd.reduce(steps))
+        buckets=[list() for _ in range(size)]
+        buckets[0].append(np.array([initIndex],dtype=np.int64))
+        pending=1
+        pushes=1
+        expanded=0
+        current=0
+        
+        while pending:
+            bucket=buckets[current%size]
+            if not bucket:
+                current+=stride
+                continue
+            pending-=len(bucket)
+            frontier=np.concatenate(bucket) if len(bucket)>1 else bucket[0]
+            bucket.clear()
+            
+            #cells whose COC was lowered after they were put in this bucket are closed already
+            frontier=frontier[closed[frontier]!=1]
+            if len(frontier)==0:
+                current+=stride
+                continue
+            closed[frontier]=1
+            order[expanded:expanded+len(frontier)]=frontier
+            expanded+=len(frontier)
+            
+            for offsets,step in groups:
+                children=(frontier[:,None]+offsets[None,:]).reshape(-1)
+                newcoc=current+step
+                if tiles is not None:
+                    unknown=children[closed[children]==UNKNOWN_CELL]
+                    if len(unknown):
+                        tiles.mark(state.closed,unknown)
+                better=closed[children]!=1
+                better[better]=labels[children[better]]>newcoc
+                children=children[better]
+                if len(children):
+                    sources=np.repeat(frontier,len(offsets))[better]
+                    labels[children]=newcoc
+                    parent[children]=sources
+                    
+                    #a child reached from several cells of the frontier is kept once, with the parent written last
+                    #a child is never pushed twice with the same COC otherwise, so the frontiers have no duplicates
+                    children=children[parent[children]==sources]
+                    buckets[newcoc%size].append(children)
+                    pending+=1
+                    pushes+=len(children)
+            current+=stride
+        
+        reached=order[:expanded]
+        cost[reached]=labels[reached]/COST_SCALE
+        state.expanded=expanded
+        state.heapPeak=0
+        state.heapOps=2*pushes
+        state.heapPushes=pushes
+        return state
+    
+    def searchAStar(self,initIndex: int,goalIndex: int,trace=None):
+        """
+        This is the A* Algorithm on the flat indexes of the cells.
+        It uses the octile distance with the costs of the action set (1 straight, 1.4 diagonal) as heuristic.
+        The heuristic never overestimates and is consistent, so a closed cell is never reopened
+        and the cost found is the same as the one of the Dijkstras Algorithm.
+
+        Args:
+            initIndex (int): flat index of the intial cell
+            goalIndex (int): flat index of the goal cell
+            trace (TraceWriter): trace the expansions are written to
+
+        Returns:
+            float: cost of the optimal path to the goal cell, None if it was not reached
+        """
+        state=self.state
+        q=self.q
+        state.reset(q)
+        
+        width=self.width
+        cost=state.cost
+        parent=state.parent
+        closed=self.lookupView(state.closed,"closedLookups")
+        order=state.order
+        ygoal,xgoal=divmod(goalIndex,width)
+        
+        cost[initIndex]=0
+        parent[initIndex]=-1
+        
+        #the entries of the heap are (COC + heuristic, -COC, flat index)
+        #among entries with the same estimate the deepest one is expanded first
+        y,x=divmod(initIndex,width)
+        dx,dy=abs(x-xgoal),abs(y-ygoal)
+        heappush(q,(0.4*min(dx,dy)+max(dx,dy),-0.0,initIndex))
+        expanded=0
+        heapPeak=1
+        pushes=1
+        
+        while q:
+            _,coc,index=heappop(q)
+            if closed[index]:
+                continue
+            coc=-coc
+            closed[index]=1
+            order[expanded]=index
+            if trace is not None:
+                trace.record(index,parent[index],coc,expanded)
+            expanded+=1
+            
+            if index==goalIndex:
+                state.expanded=expanded
+                state.heapPeak=heapPeak
+                state.heapOps=2*pushes-len(q)
+                state.heapPushes=pushes
+                return coc
+            
+            for offset,step in self.moves:
+                child=index+offset
+                if not closed[child]:
+                    newcoc=coc+step
+                    if newcoc<cost[child]:
+                        cost[child]=newcoc
+                        parent[child]=index
+                        
+                        #octile distance to the goal, 1.4*min(dx,dy)+(max(dx,dy)-min(dx,dy))
+                        y,x=divmod(child,width)
+                        dx,dy=abs(x-xgoal),abs(y-ygoal)
+                        heappush(q,(newcoc+0.4*min(dx,dy)+max(dx,dy),-newcoc,child))
+                        pushes+=1
+            if len(q)>heapPeak:
+                heapPeak=len(q)
+        
+        state.expanded=expanded
+        state.heapPeak=heapPeak
+        state.heapOps=2*pushes
+        state.heapPushes=pushes
+        return None
+    
+    def searchJPS(self,initIndex: int,goalIndex: int,trace=None):
+        """
+        This is the Jump Point Search, the A* Algorithm on the jump points of the uniform 8-connected grid.
+        From every expanded cell only the directions that no equally cheap path reaches through another cell
+        are followed, and every direction is scanned without using the heap until a cell is found whose
+        neighbours have to be considered (a forced neighbour next to an obstacle, or the goal).
+        Only those jump points are pushed on the heap, with their parent being the jump point they were reached from.
+        As the diagonal actions only need the cell they go to to be free, the pruning is the one with corner cutting.
+        Once the goal is reached the cells between the jump points on the path are filled in, so the parents
+        lead from the goal to the intial cell through every cell as after the other searches.
+
+        Args:
+            initIndex (int): flat index of the intial cell
+            goalIndex (int): flat index of the goal cell
+            trace (TraceWriter): trace the expanded jump points are written to
+
+        Returns:
+            float: cost of the optimal path to the goal cell, None if it was not reached
+        """
+        state=self.state
+        q=self.q
+        state.reset(q)
+        
+        width=self.width
+        obstacleCells=self.lookupView(self.obstacleCells,"obstacleTests")
+        cost=state.cost
+        parent=state.parent
+        closed=self.lookupView(state.closed,"closedLookups")
+        order=state.order
+        ygoal,xgoal=divmod(goalIndex,width)
+        
+        def jump(index,dx,dy):
+            #scans from index in the direction (dx,dy) and returns the first jump point, -1 if an obstacle is hit
+            #the border of the grid is an obstacle so the scans always stop inside of it
+            offset=dy*width+dx
+            while True:
+                index+=offset
+                if obstacleCells[index]:
+                    return -1
+                if index==goalIndex:
+                    return index
+                if dy==0:
+                    #moving along a row, a blocked cell above or below with a free cell after it is a forced neighbour
+                    if (obstacleCells[index+width] and not obstacleCells[index+width+dx]) or \
+                       (obstacleCells[index-width] and not obstacleCells[index-width+dx]):
+                        return index
+                elif dx==0:
+                    if (obstacleCells[index+1] and not obstacleCells[index+1+offset]) or \
+                       (obstacleCells[index-1] and not obstacleCells[index-1+offset]):
+                        return index
+                else:
+                    if (obstacleCells[index-dx] and not obstacleCells[index-dx+dy*width]) or \
+                       (obstacleCells[index-dy*width] and not obstacleCells[index+dx-dy*width]):
+                        return index
+                    #a diagonal cell from which a straight scan finds a jump point is a jump point itself
+                    if jump(index,dx,0)!=-1 or jump(index,0,dy)!=-1:
+                        return index
+        
+        cost[initIndex]=0
+        parent[initIndex]=-1
+        
+        #the entries of the heap are (COC + heuristic, -COC, flat index) as for the A* Algorithm
+        y,x=divmod(initIndex,width)
+        dx,dy=abs(x-xgoal),abs(y-ygoal)
+        heappush(q,(0.4*min(dx,dy)+max(dx,dy),-0.0,initIndex))
+        expanded=0
+        heapPeak=1
+        pushes=1
+        
+        while q:
+            _,coc,index=heappop(q)
+            if closed[index]:
+                continue
+            coc=-coc
+            closed[index]=1
+            order[expanded]=index
+            if trace is not None:
+                trace.record(index,parent[index],coc,expanded)
+            expanded+=1
+            
+            if index==goalIndex:
+                state.expanded=expanded
+                state.heapPeak=heapPeak
+                state.heapOps=2*pushes-len(q)
+                state.heapPushes=pushes
+                return self.fillJumps(goalIndex)
+            
+            #directions to scan: all eight from the intial cell, otherwise the one of the step from the parent,
+            #its straight parts if it is diagonal, and the forced neighbours next to the obstacles beside the cell
+            y,x=divmod(index,width)
+            if parent[index]==-1:
+                directions=[(dx,dy) for dx,dy,_ in ACTIONS]
+            else:
+                py,px=divmod(parent[index],width)
+                dx,dy=(x>px)-(x<px),(y>py)-(y<py)
+                directions=[(dx,dy)]
+                if dx and dy:
+                    directions+=[(dx,0),(0,dy)]
+                    if obstacleCells[index-dx]:
+                        directions.append((-dx,dy))
+                    if obstacleCells[index-dy*width]:
+                        directions.append((dx,-dy))
+                elif dx:
+                    if obstacleCells[index+width]:
+                        directions.append((dx,1))
+                    if obstacleCells[index-width]:
+                        directions.append((dx,-1))
+                else:
+                    if obstacleCells[index+1]:
+                        directions.append((1,dy))
+                    if obstacleCells[index-1]:
+                        directions.append((-1,dy))
+            
+            for dx,dy in directions:
+                child=jump(index,dx,dy)
+                if child==-1 or closed[child]:
+                    continue
+                cy,cx=divmod(child,width)
+                steps=max(abs(cx-x),abs(cy-y))
+                newcoc=coc+(1.4 if dx and dy else 1)*steps
+                if newcoc<cost[child]:
+                    cost[child]=newcoc
+                    parent[child]=index
+                    hx,hy=abs(cx-xgoal),abs(cy-ygoal)
+                    heappush(q,(newcoc+0.4*min(hx,hy)+max(hx,hy),-newcoc,child))
+                    pushes+=1
+            if len(q)>heapPeak:
+                heapPeak=len(q)
+        
+        state.expanded=expanded
+        state.heapPeak=heapPeak
+        state.heapOps=2*pushes
+        state.heapPushes=pushes
+        return None
+    
+    def fillJumps(self,goalIndex: int) -> float:
+        #fills in the cost and parent of the cells between the jump points on the path to the goal cell
+        #the cost is added up step by step along the path as for the other searches
+        state=self.state
+        width=self.width
+        jumps=BackTrack(state,goalIndex)
+        coc=0.0
+        for previous,index in zip(jumps,jumps[1:]):
+            (py,px),(y,x)=divmod(previous,width),divmod(index,width)
+            offset=((y>py)-(y<py))*width+(x>px)-(x<px)
+            step=stepCost(previous,previous+offset,width)
+            cell=previous
+            while cell!=index:
+                state.parent[cell+offset]=cell
+                cell+=offset
+                coc+=step
+                state.cost[cell]=coc
+                if cell!=index:
+                    state.filled.append(cell)
+        return coc
+    
+    def searchBidirectional(self,initIndex: int,goalIndex: int,trace=None):
+        """
+        This is the bidirectional Dijkstras Algorithm on the flat indexes of the cells.
+        A forward search from the intial cell (in state) and a backward search from the goal cell (in reverseState)
+        close one cell each in turn. Every time a cell reached by one search is seen from the other one
+        the cost of the path through them is a candidate for the best path.
+        The search stops once the smallest COC in the two heaps add up to at least the best candidate,
+        as no path that is still unknown can be cheaper than that.
+
+        Args:
+            initIndex (int): flat index of the intial cell
+            goalIndex (int): flat index of the goal cell
+            trace (TraceWriter): trace the expansions are written to
+
+        Returns:
+            float,List[int]: cost of the optimal path and the flat indexes of the cells on it from start to goal
+                             None,[] if the goal cell was not reached
+        """
+        if self.reverseState is None:
+            self.reverseState=self.newState()
+        forward,backward=self.state,self.reverseState
+        qf,qb=self.q,self.reverseQ
+        forward.reset(qf)
+        backward.reset(qb)
+        
+        moves=self.moves
+        for state,q,index in ((forward,qf,initIndex),(backward,qb,goalIndex)):
+            state.cost[index]=0
+            state.parent[index]=-1
+            heappush(q,(0.0,index))
+            state.heapPeak=1
+            state.heapOps=1
+        
+        #the two sides as (state, heap, state of the other side, wether it is the forward search, closed flags)
+        sides=((forward,qf,backward,True,self.lookupView(forward.closed,"closedLookups")),
+               (backward,qb,forward,False,self.lookupView(backward.closed,"closedLookups")))
+        
+        #cost of the best path found so far and the cells where its forward and backward parts meet
+        best=np.inf
+        meet=None
+        turn=0
+        
+        while qf and qb and qf[0][0]+qb[0][0]<best:
+            state,q,other,isForward,closed=sides[turn]
+            turn^=1
+            cost=state.cost
+            parent=state.parent
+            otherCost=other.cost
+            
+            #skipping the stale entries until an open cell is found
+            coc,index=heappop(q)
+            while closed[index] and q:
+                coc,index=heappop(q)
+            if closed[index]:
+                continue
+            closed[index]=1
+            state.order[state.expanded]=index
+            if trace is not None:
+                trace.record(index,parent[index],coc,forward.expanded+backward.expanded,not isForward)
+            state.expanded+=1
+            
+            if otherCost[index]!=np.inf and coc+otherCost[index]<best:
+                best=coc+otherCost[index]
+                meet=(index,index)
+            
+            #an obstacle cell is closed on both sides and never reached by the other search, so it is neither
+            #pushed nor a place where the two searches meet
+            for offset,step in moves:
+                child=index+offset
+                newcoc=coc+step
+                if not closed[child] and newcoc<cost[child]:
+                    cost[child]=newcoc
+                    parent[child]=index
+                    heappush(q,(newcoc,child))
+                    state.heapOps+=1
+                
+                #the path going from this cell to the child and from there along the other search
+                if otherCost[child]!=np.inf and newcoc+otherCost[child]<best:
+                    best=newcoc+otherCost[child]
+                    meet=(index,child) if isForward else (child,index)
+            if len(q)>state.heapPeak:
+                state.heapPeak=len(q)
+        
+        #heapOps counted the pushes so far, the entries left on the heaps were never popped
+        for state,q in ((forward,qf),(backward,qb)):
+            state.heapPushes=state.heapOps
+            state.heapOps=2*state.heapOps-len(q)
+        
+        if meet is None:
+            return None,[]
+        
+        #joining the forward chain from the intial cell and the backward chain to the goal cell
+        path=BackTrack(forward,meet[0])
+        towardsGoal=BackTrack(backward,meet[1])[::-1]
+        if meet[0]==meet[1]:
+            towardsGoal=towardsGoal[1:]
+        path.extend(towardsGoal)
+        
+        #the cost is added up along the path as the COC of the backward search is stored as float32
+        return pathCost(path,self.width),path
+
+
+#Class writing the expansions of a search to a binary trace file
+#The file starts with a 16 byte header (TRACE_MAGIC, width and height of the map as uint32, 4 reserved bytes)
+#followed by one TRACE_RECORD per closed cell: flat index, parent flat index, COC and expansion number.
+#The expansions of the backward search of the bidirectional mode have TRACE_BACKWARD set in the expansion number.
+#Records are packed into a buffer which is written to the file whenever it is full.
+class TraceWriter:
+    
+    def __init__(self,path: str,width: int,height: int,bufferRecords: int = 65536):
+        self.file=open(path,"wb")
+        self.file.write(TRACE_HEADER.pack(TRACE_MAGIC,width,height,0))
+        self.buffer=bytearray(bufferRecords*TRACE_STRUCT.size)
+        self.offset=0
+        self.pack=TRACE_STRUCT.pack_into
+    
+    def record(self,index: int,parent: int,cost: float,order: int,backward: bool = False):
+        if backward:
+            order|=TRACE_BACKWARD
+        self.pack(self.buffer,self.offset,index,parent,cost,order)
+        self.offset+=TRACE_STRUCT.size
+        if self.offset==len(self.buffer):
+            self.flush()
+    
+    def flush(self):
+        self.file.write(memoryview(self.buffer)[:self.offset])
+        self.offset=0
+    
+    def close(self):
+        self.flush()
+        self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self,*exc):
+        self.close()
+
+
+def openTrace(path: str):
+    """
+    This function memory maps a trace written by TraceWriter
+
+    Args:
+        path (str): path of the trace file
+
+    Returns:
+        int,int,np.memmap: width and height of the map and the records of the trace with the fields of TRACE_RECORD
+    """
+    with open(path,"rb") as file:
+        magic,width,height,_=TRACE_HEADER.unpack(file.read(TRACE_HEADER.size))
+    if magic!=TRACE_MAGIC:
+        raise ValueError("%s is not a search trace"%path)
+    if os.path.getsize(path)==TRACE_HEADER.size:
+        return width,height,np.zeros(0,dtype=TRACE_RECORD)
+    return width,height,np.memmap(path,dtype=TRACE_RECORD,mode="r",offset=TRACE_HEADER.size)
+
+
+def readTrace(path: str,chunk: int = 65536):
+    """
+    This function reads the expansions of a trace without loading the whole trace in memory
+
+    Args:
+        path (str): path of the trace file
+        chunk (int): number of records converted to python values at a time
+
+    Yields:
+        tuple: flat index, parent flat index, COC, expansion number and wether the cell was closed by the backward search
+    """
+    _,_,records=openTrace(path)
+    for first in range(0,len(records),chunk):
+        block=records[first:first+chunk]
+        orders=block["order"]
+        yield from zip(block["index"].tolist(),block["parent"].tolist(),block["cost"].tolist(),
+                       (orders&~np.uint32(TRACE_BACKWARD)).tolist(),(orders&np.uint32(TRACE_BACKWARD)!=0).tolist())
+
+
+def stateFromTrace(path: str):
+    """
+    This function rebuilds the search states of a traced search so it can be rendered again
+
+    Args:
+        path (str): path of the trace file
+
+    Returns:
+        SearchState,SearchState,List[tuple]: the forward search state, the backward search state (None if the search was not
+                                             bidirectional) and the path from the intial cell to the last cell closed by the
+                                             forward search, which is the goal unless the search was bidirectional
+    """
+    width,height,records=openTrace(path)
+    backward=(records["order"]&np.uint32(TRACE_BACKWARD))!=0
+    states=list()
+    for side in (~backward,backward):
+        sideRecords=records[side]
+        if states and len(sideRecords)==0:
+            states.append(None)
+            break
+        state=SearchState(width,height)
+        state.expanded=len(sideRecords)
+        np.frombuffer(state.order,dtype=np.int32)[:state.expanded]=sideRecords["index"]
+        np.frombuffer(state.parent,dtype=np.int32)[sideRecords["index"]]=sideRecords["parent"]
+        np.frombuffer(state.cost,dtype=np.float32)[sideRecords["index"]]=sideRecords["cost"]
+        np.frombuffer(state.closed,dtype=np.bool_)[sideRecords["index"]]=True
+        states.append(state)
+    forward,reverse=states
+    path=list()
+    if forward.expanded:
+        #the parents of a jump point search are jump points, the cells between them are filled in
+        for i in BackTrack(forward,forward.order[forward.expanded-1]):
+            x,y=i%width,i//width
+            if path:
+                px,py=path[-1]
+                dx,dy=(x>px)-(x<px),(y>py)-(y<py)
+                path.extend((px+k*dx,py+k*dy) for k in range(1,max(abs(x-px),abs(y-py))))
+            path.append((x,y))
+    return forward,reverse,path
+
+
+#planner of a batch or daemon worker process, built on the occupancy grid shared by the parent process
+workerPlanner=None
+workerMemory=None
+
+
+def initWorker(memoryName: str,shape: tuple,resolution: float = 1.0,packed: bool = False):
+    """
+    This function attaches a batch or daemon worker process to the occupancy grid in shared memory
+
+    Args:
+        memoryName (str): name of the shared memory block holding the grid
+        shape (tuple): (height,width) of the grid
+        resolution (float): number of cells per unit of the map, see Planner
+        packed (bool): the block holds the bits of a PackedGrid instead of one byte per cell
+    """
+    from multiprocessing import shared_memory
+    
+    global workerPlanner,workerMemory
+    workerMemory=shared_memory.SharedMemory(name=memoryName)
+    if packed:
+        bits=np.ndarray(((shape[0]*shape[1]+7)//8,),dtype=np.uint8,buffer=workerMemory.buf)
+        workerPlanner=Planner(PackedGrid(bits,shape),resolution)
+    else:
+        workerPlanner=Planner(np.ndarray(shape,dtype=np.bool_,buffer=workerMemory.buf),resolution)
+
+
+def planQuery(query: tuple,mode: str = "dijkstra",queue: str = "heap",withPath: bool = False) -> dict:
+    """
+    This function plans one query of a batch or of the daemon in a worker process
+
+    Args:
+        query (tuple): (x,y) coordinates of the intial and goal point
+        mode (str): search algorithm, one of SEARCH_MODES
+        queue (str): priority queue of the search, one of QUEUES
+        withPath (bool): also return the path as a list of (x,y) coordinates
+
+    Returns:
+        dict: the points, cost, number of cells on the path, nodes expanded, heap operations and wall time of the query,
+              and the error if the query could not be planned
+    """
+    start,goal=query
+    result={"xinit":start[0],"yinit":start[1],"xgoal":goal[0],"ygoal":goal[1]}
+    begin=time.perf_counter()
+    try:
+        cost,path=workerPlanner.plan(start,goal,mode,queue=queue)
+        expanded,heapOps=workerPlanner.expanded,workerPlanner.heapOps
+    except ValueError as error:
+        cost,path,expanded,heapOps=None,[],0,0
+        result["error"]=str(error)
+    result.update(cost=cost,pathLength=len(path),expanded=expanded,heapOps=heapOps,seconds=time.perf_counter()-begin)
+    if withPath:
+        result["path"]=path
+    return result
+
+
+def planManyQuery(start: tuple,goals: list,nearest: int = None,maxCost: float = None) -> dict:
+    """
+    This function plans a query from one point to many goals of the daemon in a worker process (see Planner.planMany)
+
+    Args:
+        start (tuple): (x,y) coordinate of the intial point
+        goals (list): (x,y) coordinates of the goal points
+        nearest (int): number of nearest goals to find, None for all of them
+        maxCost (float): largest cost of the paths looked for, None for no bound
+
+    Returns:
+        dict: the intial point, the goal, cost and path of every goal found in the order of the cost, nodes expanded,
+              heap operations and wall time of the query, and the error if the query could not be planned
+    """
+    result={"xinit":start[0],"yinit":start[1]}
+    begin=time.perf_counter()
+    try:
+        goals=[{"goal":goal,"cost":cost,"path":path} for goal,cost,path in workerPlanner.planMany(start,goals,nearest,maxCost)]
+        expanded,heapOps=workerPlanner.expanded,workerPlanner.heapOps
+    except ValueError as error:
+        goals,expanded,heapOps=[],0,0
+        result["error"]=str(error)
+    result.update(goals=goals,expanded=expanded,heapOps=heapOps,seconds=time.perf_counter()-begin)
+    return result
+
+
+def readQueries(path: str):
+    """
+    This function reads the queries of a batch file.
+    A .jsonl file has one {"start": [x, y], "goal": [x, y]} object per line,
+    any other file is read as CSV rows of xinit,yinit,xgoal,ygoal with an optional header.
+
+    Args:
+        path (str): path of the batch file
+
+    Yields:
+        tuple: (x,y) coordinates of the intial and goal point
+    """
+    with open(path) as file:
+        for line in file:
+            line=line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                query=json.loads(line)
+                yield tuple(query["start"]),tuple(query["goal"])
+            else:
+                fields=line.split(",")
+                if not fields[0].strip().lstrip("-").isdigit():
+                    continue
+                xinit,yinit,xgoal,ygoal=(int(field) for field in fields)
+                yield (xinit,yinit),(xgoal,ygoal)
+
+
+def runBatch(path: str,output=sys.stdout,workers: int = None,occupancy: np.ndarray = None,mode: str = "dijkstra",
+             queue: str = "heap",resolution: float = 1.0):
+    """
+    This function plans every query of a batch file on a pool of worker processes.
+    The occupancy grid is placed in shared memory once instead of being sent with every query,
+    and the results are written as soon as they are ready, in the order of the file.
+    They are written as JSON lines for a .jsonl batch file and as CSV otherwise, with the error of a query
+    that could not be planned in the last column, which is empty for the others.
+    The bits of a PackedGrid are shared as they are, so the workers plan on the packed grid.
+
+    Args:
+        path (str): path of the batch file
+        output: file the results are written to
+        workers (int): number of worker processes, the number of cores by default
+        occupancy (np.ndarray): occupancy grid of the map or a PackedGrid, the default map is loaded if none is given
+        mode (str): search algorithm, one of SEARCH_MODES
+        queue (str): priority queue of the searches, one of QUEUES
+        resolution (float): number of cells per unit of the map the occupancy grid was compiled with
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+    
+    if occupancy is None:
+        occupancy,_=loadMap()
+    workers=workers or os.cpu_count()
+    columns=["xinit","yinit","xgoal","ygoal","cost","pathLength","expanded","heapOps","seconds","error"]
+    jsonLines=path.endswith(".jsonl")
+    if not jsonLines:
+        output.write(",".join(columns)+"\n")
+    
+    packed=isinstance(occupancy,PackedGrid)
+    cells=occupancy.bits if packed else np.ascontiguousarray(occupancy,dtype=np.bool_)
+    memory=shared_memory.SharedMemory(create=True,size=max(cells.nbytes,1))
+    try:
+        np.ndarray(cells.shape,dtype=cells.dtype,buffer=memory.buf)[:]=cells
+        with ProcessPoolExecutor(max_workers=workers,initializer=initWorker,
+                                 initargs=(memory.name,occupancy.shape,resolution,packed)) as pool:
+            
+            #a bounded number of queries is kept in flight so neither the queries nor the results pile up in memory
+            pending=deque()
+            queries=readQueries(path)
+            for query in queries:
+                pending.append(pool.submit(planQuery,query,mode,queue))
+                if len(pending)>=4*workers:
+                    writeResult(output,pending.popleft().result(),columns,jsonLines)
+            while pending:
+                writeResult(output,pending.popleft().result(),columns,jsonLines)
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def writeResult(output,result: dict,columns: List[str],jsonLines: bool):
+    #writes one result of a batch and flushes it so it can be read while the batch is running
+    #the error is quoted in the CSV, as it is the only field that is text
+    if jsonLines:
+        output.write(json.dumps(result)+"\n")
+    else:
+        fields=["" if result.get(column) is None else str(result[column]) for column in columns]
+        if fields[-1]:
+            fields[-1]='"%s"'%fields[-1].replace('"','""')
+        output.write(",".join(fields)+"\n")
+    output.flush()
+
+
+#Class for the on disk cache of the cost fields rooted at goal points
+#Each field is stored as two .npy files named after the map hash and the goal and opened memory mapped
+#The least recently used fields are deleted when the cache grows past maxBytes
+#The fields are computed with the engine given to the constructor, one of FIELD_ENGINES
+class FieldCache:
+    
+    def __init__(self,directory: str,maxBytes: int = 256*1024*1024,engine: str = "wavefront"):
+        self.directory=directory
+        self.maxBytes=maxBytes
+        self.engine=engine
+        os.makedirs(directory,exist_ok=True)
+    
+    def paths(self,mapHash: str,goal) -> tuple:
+        name=os.path.join(self.directory,"%s_%d_%d"%(mapHash,goal[0],goal[1]))
+        return name+".cost.npy",name+".parent.npy"
+    
+    def field(self,planner: Planner,goal):
+        """
+        This function returns the cost field rooted at the goal, computing and storing it if it is not cached
+
+        Args:
+            planner (Planner): planner for the map
+            goal (tuple): (x,y) coordinate of the goal point
+
+        Returns:
+            np.memmap,np.memmap: read only cost and parent arrays of the field
+        """
+        costPath,parentPath=self.paths(planner.mapHash,goal)
+        if not (os.path.exists(costPath) and os.path.exists(parentPath)):
+            cost,parent=planner.costField(goal,self.engine)
+            
+            #the files are written under a temporary name and renamed so a reader never sees a partial field
+            for path,data in ((costPath,cost),(parentPath,parent)):
+                with open(path+".tmp","wb") as file:
+                    np.save(file,data)
+                os.replace(path+".tmp",path)
+            self.evict(keep=(costPath,parentPath))
+        else:
+            #the modification time records the last use of the field for the LRU eviction
+            os.utime(costPath)
+            os.utime(parentPath)
+        return np.load(costPath,mmap_mode="r"),np.load(parentPath,mmap_mode="r")
+    
+    def plan(self,planner: Planner,start,goal):
+        """
+        This function answers a query from the cost field of its goal by following the parents from the start,
+        which takes time proportional to the length of the path once the field is cached
+
+        Args:
+            planner (Planner): planner for the map
+            start (tuple): (x,y) coordinate of the intial point
+            goal (tuple): (x,y) coordinate of the goal point
+
+        Raises:
+            ValueError: if the intial or goal point lies in obstacle space
+
+        Returns:
+            float,list: cost of the optimal path and the (x,y) coordinates on it from start to goal
+                        None,[] if there is no path between the points
+        """
+        if planner.isObstacle(*start):
+            raise ValueError("Intial point in obstacle space")
+        cost,parent=self.field(planner,goal)
+        coc=float(cost[start[1],start[0]])
+        if coc==np.inf:
+            return None,[]
+        
+        width=planner.width
+        parent=parent.reshape(-1)
+        index=start[1]*width+start[0]
+        goalIndex=goal[1]*width+goal[0]
+        path=[(start[0],start[1])]
+        while index!=goalIndex:
+            index=int(parent[index])
+            path.append((index%width,index//width))
+        return coc,path
+    
+    def evict(self,keep=()):
+        #deletes the least recently used fields until the cache fits in maxBytes
+        fields=dict()
+        for name in os.listdir(self.directory):
+            if name.endswith(".cost.npy") or name.endswith(".parent.npy"):
+                path=os.path.join(self.directory,name)
+                info=os.stat(path)
+                key=name.rsplit(".",2)[0]
+                size,used=fields.get(key,(0,0))
+                fields[key]=(size+info.st_size,max(used,info.st_mtime))
+        total=sum(size for size,_ in fields.values())
+        for key,(size,_) in sorted(fields.items(),key=lambda item: item[1][1]):
+            if total<=self.maxBytes:
+                break
+            costPath,parentPath=(os.path.join(self.directory,key+ext) for ext in (".cost.npy",".parent.npy"))
+            if costPath in keep:
+                continue
+            for path in (costPath,parentPath):
+                if os.path.exists(path):
+                    os.remove(path)
+            total-=size
+
+
+#Class for the in memory cache of the planned paths, for answering the same queries again without a search
+#The paths are keyed by the hash of the map and the two points, so a path of a map that changed is never returned
+#As the actions are symmetric the path from B to A is the path from A to B reversed, both share one entry
+#The least recently used paths are dropped once the cache holds maxEntries of them
+class PathCache:
+    
+    def __init__(self,maxEntries: int = 1024):
+        self.maxEntries=maxEntries
+        self.entries=OrderedDict()
+        self.hits=0
+        self.misses=0
+    
+    def get(self,mapHash: str,start,goal):
+        """
+        This function looks up the path between two points
+
+        Args:
+            mapHash (str): hash of the map (see occupancyHash)
+            start (tuple): (x,y) coordinate of the intial point
+            goal (tuple): (x,y) coordinate of the goal point
+
+        Returns:
+            float,list: cost of the optimal path and the (x,y) coordinates on it from start to goal,
+                        None,[] if there is no path between the points, or None if the path is not cached
+        """
+        start,goal=tuple(start),tuple(goal)
+        forward=start<=goal
+        key=(mapHash,start,goal) if forward else (mapHash,goal,start)
+        entry=self.entries.get(key)
+        if entry is None:
+            self.misses+=1
+            return None
+        self.entries.move_to_end(key)
+        self.hits+=1
+        coc,path=entry
+        return coc,list(path) if forward else path[::-1]
+    
+    def put(self,mapHash: str,start,goal,coc,path):
+        #stores the path from start to goal, oriented from the smaller to the larger point
+        start,goal=tuple(start),tuple(goal)
+        if start<=goal:
+            key,path=(mapHash,start,goal),[tuple(point) for point in path]
+        else:
+            key,path=(mapHash,goal,start),[tuple(point) for point in reversed(path)]
+        self.entries[key]=(coc,path)
+        self.entries.move_to_end(key)
+        while len(self.entries)>self.maxEntries:
+            self.entries.popitem(last=False)
+    
+    def plan(self,planner: Planner,start,goal,mode: str = "dijkstra",queue: str = "heap"):
+        """
+        This function answers a query from the cache, or plans it and caches the path.
+        Every search mode finds an optimal path, so a path cached by one mode answers the others too.
+
+        Args:
+            planner (Planner): planner for the map
+            start (tuple): (x,y) coordinate of the intial point
+            goal (tuple): (x,y) coordinate of the goal point
+            mode (str): search algorithm of the planner if the path is not cached
+            queue (str): priority queue of the planner if the path is not cached
+
+        Raises:
+            ValueError: if the intial or goal point lies in obstacle space (see Planner.plan)
+
+        Returns:
+            float,list: cost of the optimal path and the (x,y) coordinates on it from start to goal
+                        None,[] if there is no path between the points
+        """
+        mapHash=planner.mapHash
+        cached=self.get(mapHash,start,goal)
+        if cached is not None:
+            return cached
+        coc,path=planner.plan(start,goal,mode,queue=queue)
+        self.put(mapHash,start,goal,coc,path)
+        return coc,path
+    
+    def invalidate(self,mapHash: str = None):
+        #drops the paths of one map, or of every map if none is given
+        if mapHash is None:
+            self.entries.clear()
+        else:
+            for key in [key for key in self.entries if key[0]==mapHash]:
+                del self.entries[key]
+    
+    def stats(self) -> dict:
+        #number of cached paths and of lookups answered from the cache and not
+        return {"entries":len(self.entries),"maxEntries":self.maxEntries,"hits":self.hits,"misses":self.misses}
+
+
+def BackTrack(state: SearchState, goalIndex: int) -> List[int]:
+    
+    """
+    This function backtracks on the cells from the goal state to inital state to form the path.
+    The parents are read from the parent array of the search state.
+    
+    Args:
+        state (SearchState): search state in which the goal cell has been closed
+        goalIndex (int): flat index of the goal cell
+
+    Returns:
+        List[int]: flat indexes of the cells on the path from start to goal
+    """
+    #List containing the flat indexes for cells in the path.
+    path=list()
+    
+    #Adding the final cell the list.
+    path.append(goalIndex)
+    
+    #Iteratively adding the cells along the path to the list.
+    parent=state.parent[goalIndex]
+    while parent!=-1:
+        
+        #Bactracking along the path until the initial cell is reached for which the parent is -1.
+        path.append(parent)
+        parent=state.parent[parent]
+    
+    #Arranging the path so that it is from start to goal.   
+    return path[::-1]
+
+
+def stepCost(previous: int,index: int,width: int) -> float:
+    #cost of the action between two neighbouring cells given by their flat indexes
+    #a diagonal step changes both the column and the row
+    return 1.4 if (index-previous)%width and abs(index-previous)!=1 else 1
+
+
+def pathCost(path: List[int],width: int) -> float:
+    """
+    This function adds up the cost of the actions along a path, step by step from the start,
+    so every planner finds the same cost for the same path
+
+    Args:
+        path (List[int]): flat indexes of the neighbouring cells on the path from start to goal
+        width (int): number of cells along the x axis
+
+    Returns:
+        float: cost of the path in cells
+    """
+    coc=0.0
+    for previous,index in zip(path,path[1:]):
+        coc+=stepCost(previous,index,width)
+    return coc
+
+
+#profilers that can wrap a query, see profiled
+PROFILERS=("cprofile","tracemalloc")
+
+
+@contextmanager
+def profiled(profiler: str = None,output: str = None,limit: int = 25):
+    """
+    This function wraps the code of a with block in cProfile or tracemalloc and writes the report afterwards.
+    The profiler is only imported when it is asked for, without one the block runs as it is.
+
+    Args:
+        profiler (str): one of PROFILERS, None for not profiling
+        output (str): file the report is written to, stderr if none is given. For cProfile the raw statistics
+                      are written so they can be read with pstats, for tracemalloc the text report
+        limit (int): number of functions or lines in the text report
+
+    Raises:
+        ValueError: if the profiler is unknown
+    """
+    if profiler is None:
+        yield
+        return
+    
+    if profiler=="cprofile":
+        import cProfile
+        import pstats
+        profile=cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            if output is not None:
+                profile.dump_stats(output)
+            else:
+                pstats.Stats(profile,stream=sys.stderr).sort_stats("cumulative").print_stats(limit)
+    
+    elif profiler=="tracemalloc":
+        import tracemalloc
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            snapshot=tracemalloc.take_snapshot()
+            current,peak=tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines=["Traced memory: %.1f KiB now, %.1f KiB at peak"%(current/1024,peak/1024)]
+            lines+=[str(stat) for stat in snapshot.statistics("lineno")[:limit]]
+            if output is not None:
+                with open(output,"w") as file:
+                    file.write("\n".join(lines)+"\n")
+            else:
+                print("\n".join(lines),file=sys.stderr)
+    
+    else:
+        raise ValueError("Unknown profiler: %s"%profiler)
@@ -0,0 +1,79 @@
+"""
+    This scipt sends a query to the planner daemon (planner_daemon.py) and prints the optimal path.
+    It takes the same intial and goal state as Dijkstra-pathplanning-Usnik-Chawla.py, but the map is kept
+    compiled by the daemon, so the query is answered without importing NumPy or compiling the map.
+    Only the standard library is imported here to keep the start of the scipt short.
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+
+
+#socket of the daemon when no other is given, in the runtime directory of the user if there is one
+DEFAULT_SOCKET=os.path.join(os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(),"pathplanning-%d.sock"%os.getuid())
+
+
+def request(message: dict,socketPath: str = DEFAULT_SOCKET,timeout: float = None) -> dict:
+    """
+    This function sends one request to the daemon and waits for its response.
+    Requests and responses are JSON objects, one per line.
+
+    Args:
+        message (dict): the request, {"start": [x, y], "goal": [x, y]} with an optional "mode" and "queue",
+                        or {"command": "ping"}
+        socketPath (str): path of the Unix socket of the daemon
+        timeout (float): seconds to wait for the response, None for waiting as long as the query takes
+
+    Raises:
+        OSError: if the daemon is not running or the connection fails
+
+    Returns:
+        dict: the response, with the cost, nodes expanded, heap operations and path of the query or its error
+    """
+    with socket.socket(socket.AF_UNIX,socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(socketPath)
+        connection.sendall(json.dumps(message).encode()+b"\n")
+        with connection.makefile("rb") as reader:
+            line=reader.readline()
+    if not line:
+        raise ConnectionError("The daemon closed the connection without a response")
+    return json.loads(line)
+
+
+#Program starts execution from here
+if __name__=="__main__":
+    parser=argparse.ArgumentParser(description="Optimal path for the point robot from the planner daemon")
+    parser.add_argument("xinit",type=int,help="x coordinate of the intial point")
+    parser.add_argument("yinit",type=int,help="y coordinate of the intial point")
+    parser.add_argument("xgoal",type=int,help="x coordinate of the goal point")
+    parser.add_argument("ygoal",type=int,help="y coordinate of the goal point")
+    parser.add_argument("--mode",default="dijkstra",help="search algorithm, dijkstra by default")
+    parser.add_argument("--queue",default="heap",help="priority queue of the dijkstra search, heap by default")
+    parser.add_argument("--no-viz",action="store_true",help="print the response of the daemon as one JSON object")
+    parser.add_argument("--socket",default=DEFAULT_SOCKET,help="Unix socket of the daemon, %s by default"%DEFAULT_SOCKET)
+    parser.add_argument("--timeout",type=float,help="seconds to wait for the response")
+    args=parser.parse_args()
+
+    try:
+        response=request({"start":[args.xinit,args.yinit],"goal":[args.xgoal,args.ygoal],"mode":args.mode,
+                          "queue":args.queue},args.socket,args.timeout)
+    except OSError as error:
+        print("Could not reach the planner daemon at %s: %s"%(args.socket,error),file=sys.stderr)
+        sys.exit(2)
+
+    if args.no_viz:
+        print(json.dumps(response))
+    elif "error" in response:
+        print(response["error"])
+    elif response["cost"] is None:
+        print("No path exists between the intial and goal point")
+    else:
+        print("Cost of the optimal Path: ",response["cost"])
+        print("Nodes expanded: ",response["expanded"])
+        print("Heap operations: ",response["heapOps"])
+    sys.exit(1 if "error" in response else 0)
@@ -0,0 +1,213 @@
+"""
+    This scipt keeps the planner running in the background and answers queries over a Unix socket.
+    The map is compiled once and shared with a pool of worker processes, which keep their search state
+    between queries, so a query costs only its search instead of starting Python, importing NumPy and
+    compiling the map. The requests are JSON objects, one per line (see planner_client.py), and are planned
+    concurrently, so a slow query does not hold back the others. The planned paths are kept in a PathCache,
+    so a route asked for again, in either direction, is answered without a search.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from pathplanning import QUEUES,SEARCH_MODES,PathCache,initWorker,loadMap,occupancyHash,planManyQuery,planQuery
+from planner_client import DEFAULT_SOCKET
+
+
+#Class for the daemon serving the queries on one map
+class PlannerDaemon:
+
+    #Constructor copies the occupancy grid of the map into shared memory for the worker processes
+    #cacheSize is the number of paths kept in the cache of the daemon
+    #resolution is the number of cells per unit of the map the occupancy grid was compiled with
+    def __init__(self,occupancy: np.ndarray,socketPath: str = DEFAULT_SOCKET,workers: int = None,cacheSize: int = 1024,
+                 resolution: float = 1.0):
+        self.height,self.width=occupancy.shape
+        self.resolution=resolution
+        self.mapHash=occupancyHash(occupancy)
+        self.cache=PathCache(cacheSize)
+        self.socketPath=socketPath
+        self.workers=workers or os.cpu_count()
+        self.memory=shared_memory.SharedMemory(create=True,size=max(occupancy.nbytes,1))
+        np.ndarray(occupancy.shape,dtype=np.bool_,buffer=self.memory.buf)[:]=occupancy
+        self.pool=None
+        self.stopping=None
+        self.listening=False
+
+    async def serve(self):
+        """
+        This function starts the worker processes, listens on the socket and answers the queries
+        until the daemon is stopped by SIGINT or SIGTERM
+
+        Raises:
+            RuntimeError: if another daemon is listening on the socket already
+        """
+        loop=asyncio.get_running_loop()
+        self.stopping=asyncio.Event()
+        for signalNumber in (signal.SIGINT,signal.SIGTERM):
+            loop.add_signal_handler(signalNumber,self.stopping.set)
+
+        self.removeStaleSocket()
+        self.pool=ProcessPoolExecutor(max_workers=self.workers,initializer=initWorker,
+                                      initargs=(self.memory.name,(self.height,self.width),self.resolution))
+
+        #every worker is started before the first query, so no query waits for a process to start
+        await asyncio.gather(*(loop.run_in_executor(self.pool,os.getpid) for _ in range(self.workers)))
+
+        server=await asyncio.start_unix_server(self.handleConnection,path=self.socketPath)
+        self.listening=True
+        os.chmod(self.socketPath,0o600)
+        print("Planner daemon listening on %s with %d workers"%(self.socketPath,self.workers),file=sys.stderr)
+        try:
+            await self.stopping.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            self.close()
+
+    def removeStaleSocket(self):
+        #a socket file left by a daemon that did not stop cleanly is removed, a live one is an error
+        if not os.path.exists(self.socketPath):
+            return
+        with socket.socket(socket.AF_UNIX,socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.socketPath)
+            except (ConnectionRefusedError,FileNotFoundError):
+                os.unlink(self.socketPath)
+                return
+        raise RuntimeError("A planner daemon is already listening on %s"%self.socketPath)
+
+    def close(self):
+        #stops the worker processes and removes the shared memory and the socket, if it is the one of this daemon
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool=None
+        self.memory.close()
+        self.memory.unlink()
+        if self.listening and os.path.exists(self.socketPath):
+            os.unlink(self.socketPath)
+            self.listening=False
+
+    async def handleConnection(self,reader: asyncio.StreamReader,writer: asyncio.StreamWriter):
+        #answers every request of a connection as soon as it is planned, the requests may be sent one after another
+        #without waiting for the responses, which then carry the "id" of their request
+        lock=asyncio.Lock()
+        pending=set()
+
+        async def respond(line: bytes):
+            response=await self.answer(line)
+            async with lock:
+                writer.write(json.dumps(response).encode()+b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                line=await reader.readline()
+                if not line:
+                    break
+                task=asyncio.create_task(respond(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            await asyncio.gather(*pending)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def answer(self,line: bytes) -> dict:
+        """
+        This function answers one request
+
+        Args:
+            line (bytes): the request as a JSON object, {"start": [x, y], "goal": [x, y]} with an optional
+                          "mode", "queue" and "id", {"start": [x, y], "goals": [[x, y], ...]} with an optional
+                          "nearest", "maxCost" and "id", or {"command": "ping"}
+
+        Returns:
+            dict: the result of planQuery with the path, marked "cached" if it was answered from the cache,
+                  the result of planManyQuery for many goals,
+                  the size of the map, number of workers and counters of the cache for ping,
+                  or the error if the request is not valid
+        """
+        try:
+            message=json.loads(line)
+            if not isinstance(message,dict):
+                raise ValueError("a request is a JSON object")
+            if message.get("command")=="ping":
+                response={"ok":True,"width":self.width,"height":self.height,"resolution":self.resolution,
+                          "workers":self.workers,"cache":self.cache.stats()}
+            elif "goals" in message:
+                start=tuple(int(value) for value in message["start"])
+                goals=[tuple(int(value) for value in goal) for goal in message["goals"]]
+                if any(len(point)!=2 for point in [start]+goals):
+                    raise ValueError("start and goals are [x, y]")
+                response=await self.planMany(start,goals,message.get("nearest"),message.get("maxCost"))
+            else:
+                query=tuple(tuple(int(value) for value in message[point]) for point in ("start","goal"))
+                if any(len(point)!=2 for point in query):
+                    raise ValueError("start and goal are [x, y]")
+                response=await self.plan(query,message.get("mode","dijkstra"),message.get("queue","heap"))
+        except (ValueError,KeyError,TypeError) as error:
+            response={"error":"Invalid request: %s"%error}
+            message=None
+        if isinstance(message,dict) and "id" in message:
+            response["id"]=message["id"]
+        return response
+
+
+    async def plan(self,query: tuple,mode: str,queue: str) -> dict:
+        #answers a query from the cache or plans it in a worker, the queries the planner rejects are never cached
+        #so a mode or queue it does not know is still reported by the worker
+        begin=time.perf_counter()
+        start,goal=query
+        valid=mode in SEARCH_MODES and queue in QUEUES and (queue=="heap" or mode=="dijkstra")
+        cached=self.cache.get(self.mapHash,start,goal) if valid else None
+        if cached is not None:
+            cost,path=cached
+            return {"xinit":start[0],"yinit":start[1],"xgoal":goal[0],"ygoal":goal[1],"cost":cost,"pathLength":len(path),
+                    "expanded":0,"heapOps":0,"seconds":time.perf_counter()-begin,"path":path,"cached":True}
+        response=await asyncio.get_running_loop().run_in_executor(self.pool,planQuery,query,mode,queue,True)
+        if valid and "error" not in response:
+            self.cache.put(self.mapHash,start,goal,response["cost"],response["path"])
+        return response
+
+
+    async def planMany(self,start: tuple,goals: list,nearest: int,maxCost: float) -> dict:
+        #plans the paths to many goals with one search in a worker, every path found is cached for the queries to one goal
+        response=await asyncio.get_running_loop().run_in_executor(self.pool,planManyQuery,start,goals,nearest,maxCost)
+        for result in response["goals"]:
+            if result["cost"] is not None:
+                self.cache.put(self.mapHash,start,result["goal"],result["cost"],result["path"])
+        return response
+
+
+#Program starts execution from here
+if __name__=="__main__":
+    parser=argparse.ArgumentParser(description="Planner daemon answering queries over a Unix socket")
+    parser.add_argument("--map",metavar="FILE",help="JSON or YAML map file, maps/default.json by default")
+    parser.add_argument("--radius",type=float,default=0.0,help="radius of the robot, 0 for the point robot")
+    parser.add_argument("--clearance",type=float,help="clearance kept around the obstacles, the one of the map by default")
+    parser.add_argument("--resolution",type=float,default=1.0,help="number of cells per unit of the map, 1 by default")
+    parser.add_argument("--socket",default=DEFAULT_SOCKET,help="Unix socket to listen on, %s by default"%DEFAULT_SOCKET)
+    parser.add_argument("--workers",type=int,help="number of worker processes, the number of cores by default")
+    parser.add_argument("--cache-size",type=int,default=1024,help="number of paths kept in the cache, 1024 by default")
+    args=parser.parse_args()
+
+    occupancy=loadMap(args.map,radius=args.radius,clearance=args.clearance,resolution=args.resolution)[0]
+    daemon=PlannerDaemon(occupancy,args.socket,args.workers,args.cache_size,args.resolution)
+    try:
+        asyncio.run(daemon.serve())
+    except RuntimeError as error:
+        daemon.close()
+        print(error,file=sys.stderr)
+        sys.exit(1)
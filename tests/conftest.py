@@ -0,0 +1,49 @@
+"""
+    Shared maps and checks of the tests. The modules of the planner are imported from the root of the repository.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pathplanning import DEFAULT_MAP,loadMap,readMapFile
+
+
+def randomGrid(seed: int,width: int = 48,height: int = 36,density: float = 0.3) -> np.ndarray:
+    #random occupancy grid with its border cells as obstacles, as the planners need them
+    rng=np.random.default_rng(seed)
+    grid=rng.random((height,width))<density
+    grid[[0,-1],:]=True
+    grid[:,[0,-1]]=True
+    return grid
+
+
+def freeCells(grid: np.ndarray,count: int,seed: int) -> list:
+    #count different random free cells of a grid as (x,y) coordinates
+    rng=np.random.default_rng(seed)
+    free=np.argwhere(~grid)
+    return [(int(x),int(y)) for y,x in free[rng.choice(len(free),size=count,replace=False)]]
+
+
+def assertPath(grid: np.ndarray,path: list,start: tuple,goal: tuple,cost: float):
+    #a path goes from start to goal through free neighbouring cells and costs what the planner returned
+    assert path[0]==tuple(start) and path[-1]==tuple(goal)
+    total=0.0
+    for (x0,y0),(x1,y1) in zip(path,path[1:]):
+        assert max(abs(x1-x0),abs(y1-y0))==1 and not grid[y1,x1]
+        total+=1.4 if x1!=x0 and y1!=y0 else 1
+    assert total==pytest.approx(cost)
+
+
+@pytest.fixture(scope="session")
+def defaultSpec() -> dict:
+    return readMapFile(DEFAULT_MAP)
+
+
+@pytest.fixture(scope="session")
+def defaultGrid() -> np.ndarray:
+    return loadMap(cacheDir=None)[0]
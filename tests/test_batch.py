@@ -0,0 +1,52 @@
+"""
+    Tests of the batch runner: the worker processes share the grid, bit-packed or not, and have to answer as
+    a planner in this process.
+"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from conftest import freeCells,randomGrid
+from pathplanning import PackedGrid,Planner,runBatch
+
+
+@pytest.mark.parametrize("extension,packed",[("csv",False),("jsonl",False),("csv",True)])
+def testBatchMatchesPlanner(tmp_path,extension,packed):
+    grid=randomGrid(4,density=0.35)
+    points=freeCells(grid,16,4)
+    queries=list(zip(points[0::2],points[1::2]))
+
+    #the last query starts on an obstacle, so it can not be planned
+    queries.append(((0,0),points[0]))
+    path=str(tmp_path/("queries."+extension))
+    with open(path,"w") as file:
+        if extension=="jsonl":
+            file.writelines(json.dumps({"start":start,"goal":goal})+"\n" for start,goal in queries)
+        else:
+            file.write("xinit,yinit,xgoal,ygoal\n")
+            file.writelines("%d,%d,%d,%d\n"%(*start,*goal) for start,goal in queries)
+
+    output=io.StringIO()
+    runBatch(path,output,workers=2,occupancy=PackedGrid(grid) if packed else grid,mode="astar")
+    if extension=="jsonl":
+        results=[json.loads(line) for line in output.getvalue().splitlines()]
+    else:
+        results=list(csv.DictReader(io.StringIO(output.getvalue())))
+    assert len(results)==len(queries)
+
+    #the results come in the order of the file
+    planner=Planner(grid)
+    for (start,goal),result in zip(queries[:-1],results):
+        assert (int(result["xinit"]),int(result["yinit"]),int(result["xgoal"]),int(result["ygoal"]))==(*start,*goal)
+        cost,path=planner.plan(start,goal)
+        if cost is None:
+            assert result["cost"] in (None,"") and int(result["pathLength"])==0
+        else:
+            assert float(result["cost"])==pytest.approx(cost)
+            assert int(result["pathLength"])==len(path)
+        assert not result.get("error")
+    assert results[-1]["error"]=="Intial point in obstacle space"
+    assert results[-1]["cost"] in (None,"")
@@ -0,0 +1,85 @@
+"""
+    Tests of the caches of the planner: the answers from a cache have to be the answers of a new search.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from conftest import assertPath,freeCells,randomGrid
+from pathplanning import FieldCache,PathCache,Planner
+
+
+@pytest.mark.parametrize("engine",["search","wavefront"])
+def testFieldCacheMatchesSearch(tmp_path,engine):
+    grid=randomGrid(7,density=0.25)
+    planner=Planner(grid)
+    cache=FieldCache(str(tmp_path),engine=engine)
+    goal,*starts=freeCells(grid,9,7)
+    reachable=int(np.isfinite(Planner(grid).costField(goal)[0]).sum())
+
+    #the first query computes the field and reports its search, the others follow the stored parents
+    for i,start in enumerate(starts):
+        planner.expanded=0
+        expected,_=Planner(grid).plan(start,goal)
+        cost,path=cache.plan(planner,start,goal)
+        assert planner.expanded==(reachable if i==0 else 0)
+        if expected is None:
+            assert cost is None and path==[]
+        else:
+            assert cost==pytest.approx(expected,rel=1e-6)
+            assertPath(grid,path,start,goal,cost)
+    assert len(os.listdir(tmp_path))==2
+
+
+def testFieldCacheEvictsLeastRecentlyUsed(tmp_path):
+    grid=randomGrid(8,density=0.1)
+    planner=Planner(grid)
+    start,*goals=freeCells(grid,4,8)
+
+    #the cache has room for two fields, so the third evicts the one used least recently
+    size=2*grid.size*4+2*128
+    cache=FieldCache(str(tmp_path),maxBytes=2*size+size//2)
+    cache.plan(planner,start,goals[0])
+    cache.plan(planner,start,goals[1])
+    os.utime(cache.paths(planner.mapHash,goals[0])[0],(0,0))
+    os.utime(cache.paths(planner.mapHash,goals[0])[1],(0,0))
+    cache.plan(planner,start,goals[2])
+    kept=[all(os.path.exists(path) for path in cache.paths(planner.mapHash,goal)) for goal in goals]
+    assert kept==[False,True,True]
+
+
+def testPathCacheReverseHitAndUpdate():
+    grid=randomGrid(5,density=0.15)
+    planner=Planner(grid)
+    cache=PathCache()
+    start,goal=freeCells(grid,2,5)
+    cost,path=cache.plan(planner,start,goal)
+    assert cache.stats()["misses"]==1
+    
+    #the path back is the same path reversed, answered without a search
+    assert cache.get(planner.mapHash,goal,start)==(cost,path[::-1])
+    assert cache.stats()["hits"]==1
+    
+    #a change of the map changes its hash, so the old path is not returned
+    planner.updateMap(blocked=path[1:-1])
+    assert cache.get(planner.mapHash,start,goal) is None
+    grid[tuple(np.array(path[1:-1])[:,::-1].T)]=True
+    assert cache.plan(planner,start,goal)==Planner(grid).plan(start,goal)
+
+
+def testPathCacheEvictsLeastRecentlyUsed():
+    grid=randomGrid(15,density=0.15)
+    planner=Planner(grid)
+    cache=PathCache(maxEntries=2)
+    points=freeCells(grid,6,15)
+    queries=list(zip(points[0::2],points[1::2]))
+    for start,goal in queries[:2]:
+        cache.plan(planner,start,goal)
+    
+    #the first path is used again, so the second one is dropped for the third
+    assert cache.get(planner.mapHash,*queries[0]) is not None
+    cache.plan(planner,*queries[2])
+    assert cache.get(planner.mapHash,*queries[1]) is None
+    assert cache.get(planner.mapHash,*queries[0]) is not None
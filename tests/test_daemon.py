@@ -0,0 +1,58 @@
+"""
+    Tests of the planner daemon over its Unix socket, with the client of planner_client.py.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from conftest import freeCells,randomGrid
+from pathplanning import Planner
+from planner_client import request
+from planner_daemon import PlannerDaemon
+
+
+def testDaemonAnswersQueries(tmp_path):
+    grid=randomGrid(14,density=0.25)
+    socketPath=str(tmp_path/"planner.sock")
+    daemon=PlannerDaemon(grid,socketPath,workers=2,cacheSize=8)
+    start,goal,*goals=freeCells(grid,6,14)
+    expected,expectedPath=Planner(grid).plan(start,goal)
+
+    async def queries():
+        serving=asyncio.create_task(daemon.serve())
+        while not daemon.listening:
+            await asyncio.sleep(0.01)
+        loop=asyncio.get_running_loop()
+        try:
+            #the client blocks, so it is run in a thread while the daemon answers in this loop
+            ask=lambda message: loop.run_in_executor(None,request,message,socketPath,10)
+            responses=[await ask({"command":"ping"}),
+                       await ask({"start":start,"goal":goal,"id":7}),
+                       await ask({"start":goal,"goal":start,"mode":"astar"}),
+                       await ask({"start":start,"goals":goals,"nearest":2}),
+                       await ask({"start":[0,0],"goal":goal}),
+                       await ask({"start":start})]
+        finally:
+            daemon.stopping.set()
+            await serving
+        return responses
+
+    ping,planned,cached,many,obstacle,invalid=asyncio.run(queries())
+    assert (ping["width"],ping["height"],ping["workers"])==(grid.shape[1],grid.shape[0],2)
+    assert planned["id"]==7 and "cached" not in planned
+    assert planned["cost"]==pytest.approx(expected)
+    assert [tuple(cell) for cell in planned["path"]]==expectedPath
+
+    #the route back is answered from the cache with the same path reversed
+    assert cached["cached"] and cached["expanded"]==0
+    assert cached["cost"]==planned["cost"] and cached["path"]==planned["path"][::-1]
+
+    costs=sorted(cost for cost in (Planner(grid).plan(start,tuple(other))[0] for other in goals) if cost is not None)
+    assert [result["cost"] for result in many["goals"]]==pytest.approx(costs[:2])
+    assert obstacle["error"]=="Intial point in obstacle space"
+    assert invalid["error"].startswith("Invalid request")
+
+    #the socket of a stopped daemon is removed
+    assert not os.path.exists(socketPath)
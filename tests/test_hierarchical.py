@@ -0,0 +1,51 @@
+"""
+    Tests of the hierarchical planner against the dijkstra search: its paths may be longer than the optimal ones,
+    but it has to find a path whenever there is one.
+"""
+
+import numpy as np
+import pytest
+
+from conftest import assertPath,freeCells,randomGrid
+from hierarchical import HierarchicalPlanner
+from pathplanning import Planner
+
+
+#the maps of seeds 3, 20 and 27 have goals that are only reached through a diagonal step across a border
+@pytest.mark.parametrize("seed,clusterSize",[(0,16),(1,16),(2,8),(3,8),(20,8),(27,8)])
+def testHierarchicalFindsEveryPath(seed,clusterSize):
+    #the denser maps are split into parts and have many cells joined only by a diagonal step
+    grid=randomGrid(seed,width=120,height=80,density=0.4 if seed%2 else 0.3)
+    hierarchy=HierarchicalPlanner(grid,clusterSize)
+    hierarchy.preprocess()
+    planner=Planner(grid)
+    points=freeCells(grid,30,seed)
+    for start,goal in zip(points[0::2],points[1::2]):
+        expected,_=planner.plan(start,goal)
+        cost,path=hierarchy.plan(start,goal)
+        if expected is None:
+            assert cost is None and path==[]
+        else:
+            assert cost>=expected-1e-9
+            assertPath(grid,path,start,goal,cost)
+
+
+def testDiagonalCrossingBetweenClusters():
+    #the two halves of the map only touch diagonally across the border of the clusters, at the cells (3,3) and (4,4)
+    grid=np.ones((10,10),dtype=np.bool_)
+    grid[1:4,1:4]=False
+    grid[4:9,4:9]=False
+    hierarchy=HierarchicalPlanner(grid,4)
+    hierarchy.preprocess()
+    cost,path=hierarchy.plan((1,1),(8,8))
+    assert cost>=Planner(grid).plan((1,1),(8,8))[0]
+    assertPath(grid,path,(1,1),(8,8),cost)
+
+
+def testCachedGraphMatchesPreprocessed(tmp_path):
+    grid=randomGrid(11,width=80,height=60,density=0.3)
+    built=HierarchicalPlanner.cached(grid,8,cacheDir=str(tmp_path))
+    loaded=HierarchicalPlanner.cached(grid,8,cacheDir=str(tmp_path))
+    assert loaded.edges==built.edges
+    start,goal=freeCells(grid,2,11)
+    assert loaded.plan(start,goal)==built.plan(start,goal)
@@ -0,0 +1,37 @@
+"""
+    Tests of the incremental planner: after the obstacles change, its repaired paths have to cost what a new
+    search on the changed map costs.
+"""
+
+import numpy as np
+import pytest
+
+from conftest import assertPath,freeCells,randomGrid
+from incremental import IncrementalPlanner
+from pathplanning import Planner
+
+
+@pytest.mark.parametrize("seed",range(4))
+def testIncrementalMatchesFreshSearch(seed):
+    grid=randomGrid(seed,density=0.2)
+    incremental=IncrementalPlanner(grid)
+    start,goal=freeCells(grid,2,seed)
+    _,path=incremental.plan(start,goal)
+    
+    #blocking cells of the path forces a repair, freeing cells may open a shorter path
+    rng=np.random.default_rng(seed)
+    blocked=[cell for cell in path[1:-1] if rng.random()<0.3]
+    freed=[(int(x),int(y)) for y,x in np.argwhere(grid[1:-1,1:-1])[:40]+1]
+    for change in ({"blocked":blocked},{"freed":freed}):
+        incremental.update(**change)
+        for x,y in change.get("blocked",[]):
+            grid[y,x]=True
+        for x,y in change.get("freed",[]):
+            grid[y,x]=False
+        expected,_=Planner(grid).plan(start,goal)
+        cost,path=incremental.plan(start,goal)
+        if expected is None:
+            assert cost is None
+        else:
+            assert cost==pytest.approx(expected)
+            assertPath(grid,path,start,goal,cost)
@@ -0,0 +1,28 @@
+"""
+    Tests of the compiled maps: the distance field and the occupancy grids built from it.
+"""
+
+import sys
+
+import numpy as np
+import pytest
+
+from pathplanning import distanceTransform
+
+
+@pytest.mark.parametrize("shape,density",[((37,53),0.05),((1,40),0.1),((40,1),0.1),((60,60),0.001),((30,30),0.5)])
+def testDistanceTransformWithoutSciPy(monkeypatch,shape,density):
+    #the NumPy passes are used when SciPy can not be imported
+    monkeypatch.setitem(sys.modules,"scipy.ndimage",None)
+    obstacles=np.random.default_rng(shape[0]).random(shape)<density
+    obstacles[0,0]=True
+    
+    #the distance of every cell to every obstacle cell, the nearest one kept
+    y,x=np.indices(shape)
+    oy,ox=np.nonzero(obstacles)
+    expected=np.sqrt(((y[...,None]-oy)**2+(x[...,None]-ox)**2).min(axis=-1)).astype(np.float32)
+    assert np.array_equal(distanceTransform(obstacles),expected)
+
+
+def testDistanceTransformWithoutObstacles():
+    assert np.isinf(distanceTransform(np.zeros((4,5),dtype=np.bool_))).all()
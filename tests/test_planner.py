@@ -0,0 +1,151 @@
+"""
+    Tests of the planners against each other: every search mode, engine and storage of the map has to find
+    the same optimal costs as the dijkstra search on a compiled grid.
+"""
+
+import numpy as np
+import pytest
+
+from conftest import assertPath,freeCells,randomGrid
+from pathplanning import PackedGrid,Planner,TiledOccupancy,compileMap
+
+
+#a map description with concave polygons, circles and a clearance for comparing the tiles with compileMap
+SPEC={"width":150,"height":110,"clearance":2,"obstacles":[
+    {"type":"circle","center":[40,30],"radius":12},
+    {"type":"circle","center":[148,100],"radius":9},
+    {"type":"polygon","points":[[70,10],[120,15],[95,40],[118,70],[72,60]]},
+    {"type":"polygon","points":[[10,80],[60,75],[35,105]]}]}
+
+
+@pytest.mark.parametrize("seed",range(6))
+@pytest.mark.parametrize("mode,queue",[("dijkstra","bucket"),("astar","heap"),("bidirectional","heap"),("jps","heap")])
+def testModesMatchDijkstra(seed,mode,queue):
+    #the denser maps are split into parts, so some goals can not be reached
+    grid=randomGrid(seed,density=0.3 if seed%2 else 0.45)
+    reference=Planner(grid)
+    planner=Planner(grid)
+    points=freeCells(grid,8,seed)
+    for start,goal in zip(points[0::2],points[1::2]):
+        expected,_=reference.plan(start,goal)
+        cost,path=planner.plan(start,goal,mode,queue=queue)
+        if expected is None:
+            assert cost is None and path==[]
+        else:
+            assert cost==pytest.approx(expected)
+            assertPath(grid,path,start,goal,cost)
+
+
+def testWavefrontOnFreshTiles(defaultSpec,defaultGrid):
+    #the first query of a tiled planner starts with every tile unknown, the start cell included
+    planner=Planner(TiledOccupancy(defaultSpec,tileSize=64))
+    cost,_=planner.costField((105,50),"wavefront")
+    expected,_=Planner(defaultGrid).costField((105,50),"wavefront")
+    assert planner.expanded==np.isfinite(expected).sum()
+    assert np.array_equal(cost,expected)
+
+
+@pytest.mark.parametrize("storage",["compiled","packed","tiled"])
+def testWavefrontMatchesSearch(defaultSpec,defaultGrid,storage):
+    #the tiled planners are built fresh for every engine, so no tile is marked by an earlier search
+    def planner():
+        if storage=="packed":
+            return Planner(PackedGrid(defaultGrid))
+        if storage=="tiled":
+            return Planner(TiledOccupancy(defaultSpec,tileSize=32))
+        return Planner(defaultGrid)
+    
+    for goal in ((105,50),(200,185)):
+        searched,_=planner().costField(goal,"search")
+        swept,parent=planner().costField(goal,"wavefront")
+        reached=np.isfinite(searched)
+        assert np.array_equal(reached,np.isfinite(swept))
+        assert np.allclose(swept[reached],searched[reached],atol=1e-3)
+        
+        #every reached cell but the goal has a parent
+        rooted=parent==-1
+        rooted[goal[1],goal[0]]=~rooted[goal[1],goal[0]]
+        assert np.array_equal(rooted,~reached)
+
+
+@pytest.mark.parametrize("seed",range(3))
+def testPackedSearchMatchesCompiled(seed):
+    grid=randomGrid(seed,density=0.35)
+    compiled=Planner(grid)
+    packed=Planner(PackedGrid(grid))
+    
+    #the closed flags of a packed map stay packed, one bit per cell
+    assert isinstance(packed.state.closed,PackedGrid)
+    assert packed.memoryUsage()["search"]<compiled.memoryUsage()["search"]
+    
+    points=freeCells(grid,8,seed)
+    queries=list(zip(points[0::2],points[1::2]))
+    for mode,queue in (("dijkstra","heap"),("dijkstra","bucket"),("astar","heap"),("bidirectional","heap"),("jps","heap")):
+        for start,goal in queries:
+            assert packed.plan(start,goal,mode,queue=queue)==compiled.plan(start,goal,mode,queue=queue)
+    
+    #the cells blocked on the map are closed in the packed search state as well
+    start,goal=queries[0]
+    _,path=compiled.plan(start,goal)
+    if len(path)>2:
+        for planner in (compiled,packed):
+            planner.updateMap(blocked=path[1:-1])
+        assert packed.plan(start,goal)==compiled.plan(start,goal)
+        assert np.array_equal(packed.state.closedGrid(),compiled.state.closedGrid())
+
+
+def testPlanManyLimits():
+    grid=randomGrid(3,density=0.2)
+    planner=Planner(grid)
+    start,*goals=freeCells(grid,12,3)
+    expected={goal:planner.plan(start,goal)[0] for goal in goals}
+    reachable=sorted((cost,goal) for goal,cost in expected.items() if cost is not None)
+    
+    results=list(planner.planMany(start,goals))
+    assert {goal:cost for goal,cost,_ in results}==pytest.approx(expected)
+    found=[cost for _,cost,_ in results if cost is not None]
+    assert found==sorted(found)
+    for goal,cost,path in results:
+        if cost is not None:
+            assertPath(grid,path,start,goal,cost)
+    
+    nearest=list(planner.planMany(start,goals,nearest=3))
+    assert [cost for _,cost,_ in nearest]==pytest.approx([cost for cost,_ in reachable[:3]])
+    
+    bound=reachable[len(reachable)//2][0]
+    bounded={goal:cost for goal,cost,_ in planner.planMany(start,goals,maxCost=bound)}
+    assert set(bounded)==set(goals)
+    for goal,cost in expected.items():
+        if cost is not None and cost<=bound:
+            assert bounded[goal]==pytest.approx(cost)
+        else:
+            assert bounded[goal] is None
+
+
+@pytest.mark.parametrize("tileSize",[7,16,64,256])
+@pytest.mark.parametrize("radius,resolution",[(0.0,1.0),(3.0,1.0),(1.5,2.0)])
+def testTilesMatchCompileMap(tileSize,radius,resolution):
+    expected,_=compileMap(SPEC,radius=radius,resolution=resolution)
+    tiles=TiledOccupancy(SPEC,radius=radius,resolution=resolution,tileSize=tileSize)
+    assert tiles.shape==expected.shape
+    assert np.array_equal(tiles.unpack(),expected)
+    
+    #the cells read one by one, through a small cache that has to compute the tiles again
+    tiles=TiledOccupancy(SPEC,radius=radius,resolution=resolution,tileSize=tileSize,maxTiles=2)
+    flat=expected.reshape(-1)
+    for index in np.random.default_rng(0).choice(flat.size,size=500,replace=False).tolist():
+        assert bool(tiles[index])==flat[index]
+
+
+def testTiledSearchMatchesCompiled():
+    #the sparse search state of a tiled map, with a cache too small for the tiles of one query
+    grid,_=compileMap(SPEC)
+    compiled=Planner(grid)
+    tiled=Planner(TiledOccupancy(SPEC,tileSize=16,maxTiles=4))
+    points=freeCells(grid,12,1)
+    for start,goal in zip(points[0::2],points[1::2]):
+        for mode,queue in (("dijkstra","heap"),("dijkstra","bucket"),("astar","heap"),("bidirectional","heap"),("jps","heap")):
+            expected,_=compiled.plan(start,goal,mode,queue=queue)
+            cost,path=tiled.plan(start,goal,mode,queue=queue)
+            assert cost==pytest.approx(expected)
+            assertPath(grid,path,start,goal,cost)
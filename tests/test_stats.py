@@ -0,0 +1,62 @@
+"""
+    Tests of the counters and profilers of a query.
+"""
+
+import pstats
+
+import numpy as np
+import pytest
+
+from conftest import freeCells,randomGrid
+from pathplanning import Planner,profiled
+
+
+def testStatsOfCorridor():
+    #in a corridor every cell is pushed and closed once, and no cell is reached twice
+    grid=np.ones((3,12),dtype=np.bool_)
+    grid[1,1:-1]=False
+    planner=Planner(grid)
+    planner.countLookups=True
+    assert planner.plan((1,1),(10,1))[0]==9
+    stats=planner.queryStats()
+    assert {name:stats[name] for name in ("mode","expanded","heapPushes","heapPops","stalePops","decreaseKeys")}=={
+        "mode":"dijkstra","expanded":10,"heapPushes":10,"heapPops":10,"stalePops":0,"decreaseKeys":0}
+    
+    #the obstacles are closed before the search, so they are found by the closed set lookups
+    assert stats["obstacleTests"]==0
+    assert stats["closedLookups"]==10+9*8
+
+
+@pytest.mark.parametrize("mode",["dijkstra","astar","bidirectional"])
+def testCountingLookupsDoesNotChangeSearch(mode):
+    grid=randomGrid(12,density=0.2)
+    start,goal=freeCells(grid,2,12)
+    plain,counted=Planner(grid),Planner(grid)
+    counted.countLookups=True
+    assert counted.plan(start,goal,mode)==plain.plan(start,goal,mode)
+    
+    stats,plainStats=counted.queryStats(),plain.queryStats()
+    for name in ("expanded","heapPushes","heapPops","stalePops","decreaseKeys"):
+        assert stats[name]==plainStats[name]
+    assert plainStats["closedLookups"] is None and stats["closedLookups"]>=stats["heapPops"]
+    assert stats["heapPops"]==stats["expanded"]+stats["stalePops"]
+    assert stats["heapPushes"]>=stats["expanded"]+stats["decreaseKeys"]
+
+
+def testProfilers(tmp_path):
+    grid=randomGrid(13,density=0.2)
+    start,goal=freeCells(grid,2,13)
+    planner=Planner(grid)
+    
+    with profiled("cprofile",str(tmp_path/"query.prof")):
+        planner.plan(start,goal)
+    names={function for _,_,function in pstats.Stats(str(tmp_path/"query.prof")).stats}
+    assert "search" in names
+    
+    with profiled("tracemalloc",str(tmp_path/"query.txt")):
+        planner.plan(start,goal)
+    assert (tmp_path/"query.txt").read_text().startswith("Traced memory:")
+    
+    with pytest.raises(ValueError):
+        with profiled("perf"):
+            pass
@@ -0,0 +1,62 @@
+"""
+    Tests of the binary search traces: a trace read back has to give the exploration of the search that wrote it.
+"""
+
+import numpy as np
+import pytest
+
+from conftest import freeCells,randomGrid
+from pathplanning import Planner,TraceWriter,openTrace,readTrace,stateFromTrace
+
+
+@pytest.mark.parametrize("mode",["dijkstra","astar","jps"])
+def testTraceReplaysSearch(tmp_path,mode):
+    grid=randomGrid(6,density=0.2)
+    planner=Planner(grid)
+    start,goal=freeCells(grid,2,6)
+    path=str(tmp_path/"search.trace")
+
+    #a small buffer so the records are written in several blocks
+    with TraceWriter(path,planner.width,planner.height,bufferRecords=7) as trace:
+        cost,expected=planner.plan(start,goal,mode,trace=trace)
+    state=planner.state
+
+    events=list(readTrace(path,chunk=5))
+    assert len(events)==state.expanded
+    assert [index for index,_,_,_,_ in events]==state.closedOrder().tolist()
+    assert [order for _,_,_,order,_ in events]==sorted(order for _,_,_,order,_ in events)
+    assert not any(backward for *_,backward in events)
+    costs=np.frombuffer(state.cost,dtype=np.float32)
+    parents=np.frombuffer(state.parent,dtype=np.int32)
+    for index,parent,coc,_,_ in events:
+        assert parent==parents[index] and coc==pytest.approx(costs[index])
+
+    forward,reverse,replayed=stateFromTrace(path)
+    assert reverse is None
+    assert np.array_equal(forward.closedOrder(),state.closedOrder())
+    assert replayed==expected
+
+
+def testTraceOfBidirectionalSearch(tmp_path):
+    grid=randomGrid(9,density=0.2)
+    planner=Planner(grid)
+    start,goal=freeCells(grid,2,9)
+    path=str(tmp_path/"search.trace")
+    with TraceWriter(path,planner.width,planner.height) as trace:
+        planner.plan(start,goal,"bidirectional",trace=trace)
+
+    #the cells closed by the backward search are flagged and rebuilt into a state of their own
+    width,height,records=openTrace(path)
+    assert (width,height)==(planner.width,planner.height)
+    backward=[flag for *_,flag in readTrace(path)]
+    forward,reverse,_=stateFromTrace(path)
+    assert reverse is not None
+    assert forward.expanded+reverse.expanded==len(records)==planner.expanded
+    assert reverse.expanded==sum(backward)>0
+
+
+def testOpenTraceRejectsOtherFiles(tmp_path):
+    path=tmp_path/"other.bin"
+    path.write_bytes(bytes(64))
+    with pytest.raises(ValueError):
+        openTrace(str(path))
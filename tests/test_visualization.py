@@ -0,0 +1,45 @@
+"""
+    Tests of the headless rendering of an exploration.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+cv2=pytest.importorskip("cv2")
+
+from conftest import freeCells,randomGrid
+from pathplanning import Planner
+from visualization import renderExploration
+
+
+def search():
+    #state and path of a search on a random map, with a blank render layer of the same size
+    grid=randomGrid(2,width=64,height=48,density=0.1)
+    planner=Planner(grid)
+    start,goal=freeCells(grid,2,2)
+    _,path=planner.plan(start,goal)
+    return planner.state,path,np.zeros(grid.shape+(3,),dtype=np.uint8)
+
+
+@pytest.mark.parametrize("maxFrames",[1,2,5,40,None])
+def testRenderedFramesRespectMaxFrames(tmp_path,maxFrames):
+    state,path,layer=search()
+    frames=renderExploration(state,path,str(tmp_path/"frames"),cellsPerFrame=10,maxFrames=maxFrames,layer=layer)
+    assert frames==len(os.listdir(tmp_path/"frames"))
+    if maxFrames:
+        assert frames<=maxFrames
+    else:
+        assert frames==-(-state.expanded//10)+1
+
+
+@pytest.mark.parametrize("maxFrames",[1,5,20,60])
+def testRenderedVideoRespectsMaxFrames(tmp_path,maxFrames):
+    state,path,layer=search()
+    output=str(tmp_path/"search.avi")
+    frames=renderExploration(state,path,output,cellsPerFrame=1,maxFrames=maxFrames,fps=30,layer=layer)
+    video=cv2.VideoCapture(output)
+    assert frames==int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+    assert frames<=maxFrames
+    video.release()
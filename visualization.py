@@ -0,0 +1,161 @@
+"""
+    This module draws the map and replays the exploration of a search with OpenCV,
+    either in a window or headless into a video or a sequence of images
+"""
+
+import cv2
+import numpy as np
+import os
+from collections import deque
+from typing import List
+
+from pathplanning import SearchState,loadMap
+
+
+def drawMap(layer: np.ndarray = None) -> np.ndarray:
+    """
+    This function draws the obstacle space of the map from the render layer of the compiled map
+
+    Args:
+        layer (np.ndarray): render layer of the map (see compileMap), the one of the default map if none is given
+
+    Returns:
+        np.ndarray: (height,width,3) BGR image of the map, the row of a point is height-1-y
+    """
+    if layer is None:
+        _,layer=loadMap()
+    return np.ascontiguousarray(layer[::-1])
+
+
+def explorationFrames(state: SearchState, path: List[tuple], cellsPerFrame: int = 1, reverseState: SearchState = None,
+                      layer: np.ndarray = None):
+    """
+    This function replays the exploration of a search in one pass over the cells in the order they were closed.
+    The closed cells are drawn in magenta, the cells of the backward search of the bidirectional mode in cyan.
+
+    Args:
+        state (SearchState): search state of the query
+        path (List[tuple]): This list contains the (x,y) coordinates of the cells on the optimal path
+        cellsPerFrame (int): number of cells drawn for every frame
+        reverseState (SearchState): search state of the backward search of the bidirectional mode
+        layer (np.ndarray): render layer of the map, the one of the default map if none is given
+
+    Yields:
+        np.ndarray: the image after every cellsPerFrame cells, the last one has the optimal path drawn in black
+    """
+    a=drawMap(layer)
+    top=state.height-1
+    
+    #cells in the order they were closed and wether they were closed by the backward search
+    #the bidirectional search closes one cell on each side in turn
+    cells=state.closedOrder()
+    backward=np.zeros(len(cells),dtype=np.bool_)
+    if reverseState is not None:
+        reverseCells=reverseState.closedOrder()
+        shorter=min(len(cells),len(reverseCells))
+        merged=np.empty(2*shorter,dtype=np.int32)
+        merged[0::2]=cells[:shorter]
+        merged[1::2]=reverseCells[:shorter]
+        cells=np.concatenate((merged,cells[shorter:],reverseCells[shorter:]))
+        backward=np.zeros(len(cells),dtype=np.bool_)
+        backward[1:2*shorter:2]=True
+        backward[shorter+state.expanded:]=True
+    rows=top-cells//state.width
+    columns=cells%state.width
+    colours=np.where(backward[:,None],np.uint8([255,255,0]),np.uint8([255,0,255]))
+    
+    for first in range(0,len(cells),cellsPerFrame):
+        last=first+cellsPerFrame
+        a[rows[first:last],columns[first:last]]=colours[first:last]
+        yield a
+    
+    #Drawing the optimal path
+    if path:
+        coordList=np.array([[x,top-y] for x,y in path])
+        a=cv2.polylines(a,[coordList],isClosed=False,color=[0,0,0],thickness=1)
+    yield a
+
+
+def visualize(state: SearchState, path: List[tuple], reverseState: SearchState = None, cellsPerFrame: int = 1,
+              layer: np.ndarray = None):
+    """
+    This functions is implemented after we have found out the optimal path.
+    This function is used to visualize how the Dijkstra's algorithm explores around and finds the
+    optimal path betwen goal and inital node
+
+    Args:
+        state (SearchState): search state of the query, the cells are drawn in the order they were closed
+        path (List[tuple]): This list contains the (x,y) coordinates of the cells on the optimal path
+        reverseState (SearchState): search state of the backward search of the bidirectional mode
+        cellsPerFrame (int): number of cells drawn for every frame shown
+        layer (np.ndarray): render layer of the map, the one of the default map if none is given
+    """
+    for a in explorationFrames(state,path,cellsPerFrame,reverseState,layer):
+        cv2.imshow("frame",a)
+        cv2.waitKey(3)
+    cv2.waitKey(0)    
+    cv2.destroyAllWindows()
+
+
+def renderExploration(state: SearchState, path: List[tuple], output: str, cellsPerFrame: int = 100,
+                      maxFrames: int = None, fps: int = 30, reverseState: SearchState = None,
+                      layer: np.ndarray = None) -> int:
+    """
+    This function renders the exploration of a search without a display.
+    A path ending in .avi is written as an MJPG video, one ending in .mp4 as an MPEG-4 video,
+    any other path is a directory in which every frame is written as a PNG image.
+
+    Args:
+        state (SearchState): search state of the query
+        path (List[tuple]): This list contains the (x,y) coordinates of the cells on the optimal path
+        output (str): video file or directory of the frames
+        cellsPerFrame (int): number of cells drawn for every frame
+        maxFrames (int): largest number of frames written, counting the frame with the optimal path and the frames
+                         holding it in a video, cellsPerFrame is raised to fit the exploration in the rest
+        fps (int): frame rate of the video
+        reverseState (SearchState): search state of the backward search of the bidirectional mode
+        layer (np.ndarray): render layer of the map, the one of the default map if none is given
+
+    Returns:
+        int: number of frames written, the frames holding the optimal path included
+    """
+    video=output.endswith(".avi") or output.endswith(".mp4")
+    expanded=state.expanded+(reverseState.expanded if reverseState is not None else 0)
+    
+    #the frame with the optimal path is held for a second in a video
+    #with a frame cap the hold is shortened so at least one frame of the exploration fits besides the path
+    hold=fps-1 if video else 0
+    if maxFrames:
+        hold=min(hold,max(maxFrames-2,0))
+        explorationCap=maxFrames-1-hold
+        cellsPerFrame=max(cellsPerFrame,-(-expanded//explorationCap) if explorationCap else expanded)
+    
+    writer=None
+    if video:
+        fourcc=cv2.VideoWriter_fourcc(*("MJPG" if output.endswith(".avi") else "mp4v"))
+        writer=cv2.VideoWriter(output,fourcc,fps,(state.width,state.height))
+        if not writer.isOpened():
+            raise IOError("Could not open %s for writing"%output)
+    else:
+        os.makedirs(output,exist_ok=True)
+    
+    frames=0
+    try:
+        images=explorationFrames(state,path,max(cellsPerFrame,1),reverseState,layer)
+        if maxFrames and not explorationCap:
+            #a single frame leaves no room for the exploration, only the last image with the path is written
+            images=deque(images,maxlen=1)
+        for a in images:
+            if writer is not None:
+                writer.write(a)
+            else:
+                cv2.imwrite(os.path.join(output,"frame%06d.png"%frames),a)
+            frames+=1
+        
+        for i in range(hold):
+            writer.write(a)
+            frames+=1
+    finally:
+        if writer is not None:
+            writer.release()
+    return frames